@@ -2,11 +2,6 @@
 Example usage of the task-to-code pipeline.
 """
 
-import sys
-from pathlib import Path
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 def example_jira_processing():
     """Example of processing a JIRA issue."""
@@ -5,34 +5,6 @@ Command-line interface for the task-to-code pipeline.
 
 import argparse
 import sys
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
-# Check if we're in the right environment and provide helpful error messages
-try:
-    from src.pipeline import TaskToCodePipeline
-except ImportError as e:
-    print("❌ Import Error: Required dependencies not found.")
-    print(f"   Details: {e}")
-    print()
-    print("💡 This usually means the virtual environment is not activated.")
-    print("   Please run one of the following:")
-    print()
-    print("   Option 1: Activate virtual environment manually")
-    print("   source venv/bin/activate")
-    print("   python main.py [command]")
-    print()
-    print("   Option 2: Use the activation script")
-    print("   source activate_env.sh")
-    print("   python main.py [command]")
-    print()
-    print("   Option 3: Install dependencies globally (not recommended)")
-    print("   pip install -r requirements.txt")
-    print()
-    print("📚 For more help, see README.md or run: python validate.py")
-    sys.exit(1)
 
 
 def main():
@@ -50,8 +22,8 @@ def main():
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # JIRA command
-    jira_parser = subparsers.add_parser('jira', help='Process a JIRA issue')
-    jira_parser.add_argument('issue_key', help='JIRA issue key (e.g., PROJ-123)')
+    jira_parser = subparsers.add_parser('jira', help='Process one or more JIRA issues')
+    jira_parser.add_argument('issue_keys', nargs='+', metavar='issue_key', help='JIRA issue key (e.g., PROJ-123)')
     
     # Confluence command
     confluence_parser = subparsers.add_parser('confluence', help='Process a Confluence page')
@@ -79,17 +51,25 @@ def main():
         parser.print_help()
         return
     
+    # Imported here so that --help, setup and argument errors don't pay
+    # for loading the pipeline and its API clients.
+    try:
+        from src.pipeline import TaskToCodePipeline
+    except ImportError as e:
+        print_import_error(e)
+        sys.exit(1)
+    
     try:
         pipeline = TaskToCodePipeline(args.config)
         
         if args.command == 'jira':
-            result = pipeline.process_jira_task(args.issue_key)
-            print(f"\n✅ Successfully processed JIRA issue: {args.issue_key}")
-            print(f"Generated {len(result['generated_files'])} files")
-            if result['dependencies']:
-                print(f"\n📦 Dependencies to install:")
-                for dep in result['dependencies']:
-                    print(f"  - {dep}")
+            for result in pipeline.process_jira_tasks(args.issue_keys):
+                print(f"\n✅ Successfully processed JIRA issue: {result['issue_key']}")
+                print(f"Generated {len(result['generated_files'])} files")
+                if result['dependencies']:
+                    print(f"\n📦 Dependencies to install:")
+                    for dep in result['dependencies']:
+                        print(f"  - {dep}")
         
         elif args.command == 'confluence':
             result = pipeline.process_confluence_page(args.page_id)
@@ -118,8 +98,32 @@ def main():
         sys.exit(1)
 
 
+def print_import_error(error):
+    """Explain how to fix missing dependencies."""
+    print("❌ Import Error: Required dependencies not found.")
+    print(f"   Details: {error}")
+    print()
+    print("💡 This usually means the virtual environment is not activated.")
+    print("   Please run one of the following:")
+    print()
+    print("   Option 1: Activate virtual environment manually")
+    print("   source venv/bin/activate")
+    print("   python main.py [command]")
+    print()
+    print("   Option 2: Use the activation script")
+    print("   source activate_env.sh")
+    print("   python main.py [command]")
+    print()
+    print("   Option 3: Install dependencies globally (not recommended)")
+    print("   pip install -r requirements.txt")
+    print()
+    print("📚 For more help, see README.md or run: python validate.py")
+
+
 def setup_config():
     """Setup configuration file."""
+    from pathlib import Path
+    
     config_path = Path('config.yaml')
     template_path = Path('config.template.yaml')
     
@@ -129,14 +133,23 @@ def setup_config():
             print("Setup cancelled.")
             return
     
-    if not template_path.exists():
-        print(f"❌ Template file not found: {template_path}")
-        print("Please ensure config.template.yaml exists in the current directory.")
-        return
-    
-    # Copy template to config
-    import shutil
-    shutil.copy2(template_path, config_path)
+    if template_path.exists():
+        # Copy template to config, keeping its explanatory comments
+        import shutil
+        shutil.copy2(template_path, config_path)
+    else:
+        # No template around (e.g. running outside the checkout): write the
+        # built-in placeholders and defaults instead
+        import yaml
+        from src._config_defaults import DEFAULTS, PLACEHOLDERS
+        
+        sections = dict.fromkeys([*PLACEHOLDERS, *DEFAULTS])
+        config = {
+            section: {**PLACEHOLDERS.get(section, {}), **DEFAULTS.get(section, {})}
+            for section in sections
+        }
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(config, f, sort_keys=False)
     
     print(f"✅ Configuration file created: {config_path}")
     print("\n📝 Please edit the configuration file and fill in your values:")
@@ -0,0 +1,30 @@
+"""Built-in configuration values for the task-to-code pipeline."""
+
+# Optional settings, merged under whatever the user's config.yaml provides
+DEFAULTS = {
+    'anthropic': {
+        'model': 'claude-3-5-sonnet-20241022',
+        'max_tokens': 4000,
+        'cache': True
+    },
+    'output': {
+        'generated_code_path': './generated',
+        'test_path': './tests',
+        'backup_existing': True
+    }
+}
+
+# Required settings the user has to fill in, as written by `main.py setup`
+PLACEHOLDERS = {
+    'confluence': {
+        'base_url': 'https://your-domain.atlassian.net',
+        'username': 'your-email@example.com',
+        'api_token': 'your-api-token'
+    },
+    'project': {
+        'repository_path': '/path/to/your/project'
+    },
+    'anthropic': {
+        'api_key': 'your-anthropic-api-key'
+    }
+}
@@ -0,0 +1,91 @@
+"""JSON helpers that use orjson when it is installed."""
+
+import json
+from typing import Any, Dict, Iterator, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Responses larger than this are parsed incrementally when ijson is
+# available; below it, one-shot parsing is faster.
+STREAM_THRESHOLD = 1024 * 1024
+
+# ijson events carrying a complete scalar value
+_SCALAR_EVENTS = frozenset(['null', 'boolean', 'integer', 'double', 'number', 'string'])
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document from text or UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Serialize to indented, non-ASCII-escaped JSON text."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def iter_response_items(response: Any, key: str, rest: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Iterate over the items of a top-level array in a JSON HTTP response.
+    
+    Large bodies are parsed incrementally with ijson when it is installed,
+    so only one item is held in memory at a time. The request should be
+    made with ``stream=True`` for this to help.
+    
+    Args:
+        response: requests Response
+        key: Name of the top-level array (e.g., 'issues')
+        rest: Dictionary to fill in with the other top-level scalar values
+            of the response (e.g., a page token); complete once the items
+            are exhausted
+        
+    Returns:
+        Iterator over the array items
+    """
+    length = int(response.headers.get('Content-Length') or 0)
+    
+    if ijson is None or length <= STREAM_THRESHOLD:
+        data = loads(response.content)
+        if rest is not None:
+            rest.update((name, value) for name, value in data.items()
+                        if name != key and not isinstance(value, (dict, list)))
+        yield from data.get(key, [])
+        return
+    
+    response.raw.decode_content = True
+    if rest is None:
+        yield from ijson.items(response.raw, f'{key}.item', use_float=True)
+        return
+    
+    # Build the items from parser events, picking up top-level scalars on
+    # either side of the array along the way
+    item_prefix = f'{key}.item'
+    builder = None
+    for prefix, event, value in ijson.parse(response.raw, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == item_prefix and event in ('end_map', 'end_array'):
+                yield builder.value
+                builder = None
+        elif prefix == item_prefix:
+            if event in ('start_map', 'start_array'):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            else:
+                yield value
+        elif prefix and '.' not in prefix and event in _SCALAR_EVENTS:
+            rest[prefix] = value
@@ -0,0 +1,98 @@
+"""Regex scanners for pulling requirement lists out of task descriptions."""
+
+import re
+from typing import List
+
+# Horizontal whitespace, Unicode included, as str.strip() removes it
+_BLANK = r'[^\S\n]'
+
+# A bulleted or numbered line; leading ASCII marker characters are dropped
+# from the captured text. Numbered lines look like "1.", "12" or ".5", with
+# decimal digits only (str.isdigit() also takes superscripts and the like).
+_ITEM = r'(?=[-*•]|\d(?:[\d.]|' + _BLANK + r'*$)|\.\d)[-*•0-9. ]*(?P<text>[^\n]*?)'
+
+# Lines repeating "acceptance criteria" inside the section are skipped
+_NOT_ACCEPTANCE_HEADER = r'(?![^\n]*acceptance criteria)'
+
+_ITEM_RE = re.compile(
+    r'^' + _BLANK + r'*' + _NOT_ACCEPTANCE_HEADER + _ITEM + _BLANK + r'*$',
+    re.I | re.M
+)
+
+# First line mentioning acceptance criteria
+_ACCEPTANCE_HEADER_RE = re.compile(r'^[^\n]*acceptance criteria[^\n]*$', re.I | re.M)
+
+# A markdown heading or bold line, which starts the next section
+_SECTION_END_RE = re.compile(
+    r'^' + _BLANK + r'*' + _NOT_ACCEPTANCE_HEADER + r'(?:#|\*\*)',
+    re.I | re.M
+)
+
+# Keywords that open a requirements section, as whole words
+_REQUIREMENT_TRIGGER = r'\b(?:requirements|acceptance criteria|should|must)\b'
+
+_REQUIREMENT_TRIGGER_RE = re.compile(_REQUIREMENT_TRIGGER, re.I)
+
+# Lines that matter for requirement extraction: a line mentioning one of the
+# trigger keywords, a list item, or a non-blank line with no letters or
+# digits (e.g. a "===" rule), which ends the list
+_REQUIREMENT_LINE_RE = re.compile(
+    r'^' + _BLANK + r'*(?:'
+    r'(?P<trigger>[^\n]*' + _REQUIREMENT_TRIGGER + r'[^\n]*?)'
+    r'|' + _ITEM +
+    r'|(?P<end>(?=\S)(?:[^\w\n]|_)+?)'
+    r')' + _BLANK + r'*$',
+    re.I | re.M
+)
+
+
+def extract_acceptance_criteria(text: str) -> List[str]:
+    """
+    Extract the list items following an "acceptance criteria" line.
+    
+    Args:
+        text: Description text
+        
+    Returns:
+        List of acceptance criteria
+    """
+    header = _ACCEPTANCE_HEADER_RE.search(text)
+    if not header:
+        return []
+    
+    section_end = _SECTION_END_RE.search(text, header.end())
+    end = section_end.start() if section_end else len(text)
+    
+    return [match.group('text') for match in _ITEM_RE.finditer(text, header.end(), end)]
+
+
+def extract_requirements(text: str) -> List[str]:
+    """
+    Extract the list items following the first line that mentions requirements.
+    
+    Args:
+        text: Page content
+        
+    Returns:
+        List of requirements
+    """
+    # Skip straight to the line holding the first keyword, if there is one
+    trigger = _REQUIREMENT_TRIGGER_RE.search(text)
+    if not trigger:
+        return []
+    
+    requirements = []
+    in_requirements = False
+    line_start = text.rfind('\n', 0, trigger.start()) + 1
+    
+    for match in _REQUIREMENT_LINE_RE.finditer(text, line_start):
+        if match.group('trigger') is not None:
+            in_requirements = True
+        elif not in_requirements:
+            continue
+        elif match.group('text') is not None:
+            requirements.append(match.group('text'))
+        else:
+            break  # End of requirements section
+    
+    return requirements
@@ -1,14 +1,228 @@
 """Claude AI client for code generation using Anthropic's API."""
 
-import anthropic
-from typing import Dict, Any, List, Optional
-import json
+from __future__ import annotations
+
+import functools
+import hashlib
+import re
+import string
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import anthropic
+
+
+# Headers that split a Claude response into sections
+_SECTION_RE = re.compile(
+    r'^[ \t]*##[ \t]+(Analysis|Files to Create/Modify|Implementation Notes|Dependencies'
+    r'|Test Strategy|Test Files|Test Dependencies|Running the Tests)\b.*$',
+    re.M
+)
+
+# A "### File: path" header line
+_FILE_HEADER_RE = re.compile(r'^[ \t]*###[ \t]+File:[ \t]*([^\r\n]+?)[ \t]*\r?$', re.M)
+
+# Blank lines and the opening fence at the start of a file block
+_OPENING_FENCE_RE = re.compile(r'(?:[ \t]*\r?\n)*[ \t]*```[^\n]*(?:\n|\Z)')
+
+
+def _iter_file_blocks(body: str) -> Iterator[Tuple[str, str]]:
+    """
+    Split the body of a files section into its "### File: path" blocks.
+    
+    A block's content is its fenced code block, which ends at the last
+    closing fence of the block so fences nested in the file (e.g. examples
+    in a README) are kept. A block without a closing fence, as when the
+    response was cut off, runs to the next header, and a block without any
+    fence is taken as is. The content is sliced straight from the response,
+    so its line endings are kept as sent.
+    
+    Args:
+        body: Text of the files section
+        
+    Yields:
+        Tuples of (path, content)
+    """
+    headers = list(_FILE_HEADER_RE.finditer(body))
+    
+    for i, header in enumerate(headers):
+        last = i + 1 == len(headers)
+        end = len(body) if last else headers[i + 1].start()
+        start = header.end()
+        if body.startswith('\n', start):
+            start += 1
+        
+        fence = _OPENING_FENCE_RE.match(body, start, end)
+        if fence is None:
+            content = body[start:end].rstrip()
+        else:
+            content = body[fence.end():end].rstrip()
+            
+            # Drop the closing fence when it is the block's last line
+            line_start = content.rfind('\n') + 1
+            if content[line_start:].strip() == '```':
+                content = content[:line_start]
+                if content.endswith('\n'):
+                    content = content[:-2] if content.endswith('\r\n') else content[:-1]
+        
+        # A header at the very end was cut off before any content
+        if not content and last:
+            continue
+        
+        yield header.group(1), content
+
+
+# File extension (lowercase, without the dot) to code fence language
+_EXTENSION_LANGUAGES = {
+    'py': 'python',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'java': 'java',
+    'cpp': 'cpp',
+    'c': 'c',
+    'cs': 'csharp',
+    'php': 'php',
+    'rb': 'ruby',
+    'go': 'go',
+    'rs': 'rust',
+    'swift': 'swift',
+    'kt': 'kotlin',
+    'scala': 'scala',
+    'r': 'r',
+    'sh': 'bash',
+    'sql': 'sql',
+    'html': 'html',
+    'css': 'css',
+    'scss': 'scss',
+    'yaml': 'yaml',
+    'yml': 'yaml',
+    'json': 'json',
+    'xml': 'xml',
+    'md': 'markdown'
+}
+
+@functools.lru_cache(maxsize=128)
+def _language_for_extension(ext: str) -> str:
+    """Map a file extension (without the dot, any case) to a language."""
+    return _EXTENSION_LANGUAGES.get(ext.lower(), 'text')
+
+
+# Non-blank lines that aren't markdown headers, without surrounding whitespace
+_LIST_ITEM_RE = re.compile(r'^[ \t]*([^#\s][^\n]*?)[ \t\r]*$', re.M)
+
+_CODE_RESPONSE_SCHEMA = {
+    'Analysis': ('analysis', 'text'),
+    'Files to Create/Modify': ('files', 'files'),
+    'Implementation Notes': ('notes', 'text'),
+    'Dependencies': ('dependencies', 'list'),
+}
+
+_TEST_RESPONSE_SCHEMA = {
+    'Test Strategy': ('strategy', 'text'),
+    'Test Files': ('test_files', 'files'),
+    'Test Dependencies': ('dependencies', 'list'),
+    'Running the Tests': ('run_instructions', 'text'),
+}
+
+# Test dependencies get their own key so they don't mix with the code's
+_CODE_AND_TEST_RESPONSE_SCHEMA = {
+    **_CODE_RESPONSE_SCHEMA,
+    **_TEST_RESPONSE_SCHEMA,
+    'Test Dependencies': ('test_dependencies', 'list'),
+}
+
+# Sections of a combined response that follow the code files, so reaching
+# one means the code files are complete
+_AFTER_CODE_FILES_SECTIONS = frozenset([
+    'Implementation Notes', 'Dependencies', 'Test Strategy', 'Test Files',
+    'Test Dependencies', 'Running the Tests'
+])
+
+# Code generation prompt; ${project_context} is rendered once per project
+_CODE_GENERATION_TEMPLATE = string.Template("""You are an expert software developer. Based on the following task requirements and project context, generate the necessary code files.
+
+TASK INFORMATION:
+- Title: ${summary}
+- Type: ${issue_type}
+- Priority: ${priority}
+- Description: ${description}
+
+ACCEPTANCE CRITERIA:
+${acceptance_criteria}
+
+${project_context}
+
+REQUIREMENTS:
+1. Generate clean, maintainable code that follows the project's existing patterns
+2. Include proper error handling and logging
+3. Add comprehensive docstrings and comments
+4. Follow the coding standards evident in the existing codebase
+5. Create any necessary configuration or setup files
+6. Ensure the code integrates well with the existing project structure
+
+Please provide your response in the following format:
+
+## Analysis
+[Brief analysis of the requirements and approach]
+
+## Files to Create/Modify
+
+### File: path/to/file.ext
+```language
+[code content]
+```
+
+### File: path/to/another_file.ext
+```language
+[code content]
+```
+
+## Implementation Notes
+[Any important notes about the implementation]
+
+## Dependencies
+[List any new dependencies that need to be installed]
+""")
+
+# Extra response sections requested when tests are generated alongside code
+_TEST_SECTIONS_PROMPT = """
+## Test Strategy
+[Brief overview of the testing approach for the code above]
+
+## Test Files
+
+### File: path/to/test_file.py
+```python
+[unit and integration tests for the code above, covering edge cases and error conditions]
+```
+
+## Test Dependencies
+[List any additional testing dependencies needed]
+
+## Running the Tests
+[Instructions on how to run the tests]
+"""
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str) -> anthropic.Anthropic:
+    """
+    Return an Anthropic client for the key, shared across generators so
+    that its HTTP connection pool is reused.
+    """
+    # Imported lazily: the SDK pulls in httpx/pydantic and is only
+    # needed once a command actually talks to Claude.
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
 
 
 class ClaudeCodeGenerator:
     """Client for generating code using Claude AI."""
     
-    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022", max_tokens: int = 4000):
+    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022", max_tokens: int = 4000,
+                 cache: bool = True, cache_dir: str = ".cache/claude",
+                 combined_max_tokens: Optional[int] = None):
         """
         Initialize the Claude client.
         
@@ -16,10 +230,18 @@ class ClaudeCodeGenerator:
             api_key: Anthropic API key
             model: Claude model to use
             max_tokens: Maximum tokens for responses
+            cache: Whether to reuse stored responses for identical prompts
+            cache_dir: Directory where responses are stored
+            combined_max_tokens: Maximum tokens for responses holding both
+                code and tests; twice max_tokens by default
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = _get_client(api_key)
         self.model = model
         self.max_tokens = max_tokens
+        self.combined_max_tokens = combined_max_tokens or 2 * max_tokens
+        self.cache = cache
+        self.cache_dir = Path(cache_dir)
+        self._project_context_block = None
     
     def generate_code_from_task(self, task_data: Dict[str, Any], project_context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -34,21 +256,48 @@ class ClaudeCodeGenerator:
         """
         prompt = self._build_code_generation_prompt(task_data, project_context)
         
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            messages=[
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ]
-        )
+        content = self._send_prompt(prompt)
         
         # Parse the response to extract code files
-        content = response.content[0].text
         return self._parse_code_response(content, task_data)
     
+    def generate_code_and_tests(self, task_data: Dict[str, Any], project_context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate code and its tests with a single Claude request.
+        
+        Args:
+            task_data: Task information from Confluence/JIRA
+            project_context: Project structure and context
+            
+        Returns:
+            Dictionary with 'code' and 'tests' entries, shaped like the results
+            of generate_code_from_task and generate_tests respectively
+        """
+        prompt = self._build_code_generation_prompt(task_data, project_context, include_tests=True)
+        
+        content, stop_reason = self._complete(prompt, self.combined_max_tokens)
+        result = self._parse_code_and_test_response(content, task_data)
+        
+        if stop_reason == "max_tokens":
+            # The response was cut off. If that happened before the code
+            # sections ended, the last code file is incomplete, so ask for the
+            # code on its own; the tests come last and are asked for separately.
+            titles = set(_SECTION_RE.findall(content))
+            if titles.isdisjoint(_AFTER_CODE_FILES_SECTIONS):
+                # Without the tests the code needs less room, but it still
+                # gets the whole combined budget
+                prompt = self._build_code_generation_prompt(task_data, project_context)
+                content, stop_reason = self._complete(prompt, self.combined_max_tokens)
+                if stop_reason == "max_tokens":
+                    raise RuntimeError(
+                        f"Claude's code response was cut off at {self.combined_max_tokens} tokens; "
+                        "raise anthropic.combined_max_tokens in the config"
+                    )
+                result['code'] = self._parse_code_response(content, task_data)
+            result['tests'] = self.generate_tests(result['code']['files'], project_context)
+        
+        return result
+    
     def generate_tests(self, code_files: List[Dict[str, Any]], project_context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate unit and integration tests for the provided code.
@@ -62,18 +311,8 @@ class ClaudeCodeGenerator:
         """
         prompt = self._build_test_generation_prompt(code_files, project_context)
         
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        )
+        content = self._send_prompt(prompt)
         
-        content = response.content[0].text
         return self._parse_test_response(content)
     
     def review_and_update_code(self, existing_code: str, new_requirements: str, project_context: Dict[str, Any]) -> str:
@@ -90,82 +329,115 @@ class ClaudeCodeGenerator:
         """
         prompt = self._build_code_update_prompt(existing_code, new_requirements, project_context)
         
-        response = self.client.messages.create(
+        return self._send_prompt(prompt)
+    
+    def _send_prompt(self, prompt: str) -> str:
+        """
+        Send a single-message prompt to Claude and return the response text.
+        
+        Args:
+            prompt: Prompt to send
+            
+        Returns:
+            Text of the response
+        """
+        return self._complete(prompt, self.max_tokens)[0]
+    
+    def _complete(self, prompt: str, max_tokens: int) -> Tuple[str, str]:
+        """
+        Send a single-message prompt to Claude.
+        
+        Complete responses are stored on disk keyed by model and prompt, so
+        re-running the same task does not repeat the API call.
+        
+        Args:
+            prompt: Prompt to send
+            max_tokens: Maximum tokens for the response
+            
+        Returns:
+            Tuple of the response text and the reason it stopped
+            (e.g. "end_turn" or "max_tokens")
+        """
+        cache_path = None
+        if self.cache:
+            digest = hashlib.blake2b(
+                f"{max_tokens}\n{prompt}".encode('utf-8'), digest_size=16
+            ).hexdigest()
+            cache_path = self.cache_dir / f"{self.model}-{digest}.txt"
+            if cache_path.exists():
+                return cache_path.read_text(encoding='utf-8'), "end_turn"
+        
+        # Stream the response so text is received as it is generated rather
+        # than waiting for the whole message
+        with self.client.messages.stream(
             model=self.model,
-            max_tokens=self.max_tokens,
+            max_tokens=max_tokens,
             messages=[
                 {
                     "role": "user",
                     "content": prompt
                 }
             ]
+        ) as stream:
+            content = "".join(stream.text_stream)
+            stop_reason = stream.get_final_message().stop_reason
+        
+        # Only complete responses are stored, so one cut off at max_tokens
+        # isn't replayed on every re-run
+        if cache_path is not None and stop_reason == "end_turn":
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(content, encoding='utf-8')
+        
+        return content, stop_reason
+    
+    def _build_code_generation_prompt(self, task_data: Dict[str, Any], project_context: Dict[str, Any],
+                                      include_tests: bool = False) -> str:
+        """Build the prompt for code generation, optionally asking for tests too."""
+        prompt = _CODE_GENERATION_TEMPLATE.substitute(
+            summary=task_data.get('summary', 'N/A'),
+            issue_type=task_data.get('issue_type', 'N/A'),
+            priority=task_data.get('priority', 'N/A'),
+            description=task_data.get('description', 'N/A'),
+            acceptance_criteria="\n".join(f"- {criteria}" for criteria in task_data.get('acceptance_criteria', [])),
+            project_context=self._render_project_context(project_context)
         )
         
-        return response.content[0].text
+        if include_tests:
+            prompt += _TEST_SECTIONS_PROMPT
+        
+        return prompt
     
-    def _build_code_generation_prompt(self, task_data: Dict[str, Any], project_context: Dict[str, Any]) -> str:
-        """Build the prompt for code generation."""
+    def _render_project_context(self, project_context: Dict[str, Any]) -> str:
+        """
+        Render the project context block of the code generation prompt.
         
-        prompt = f"""You are an expert software developer. Based on the following task requirements and project context, generate the necessary code files.
-
-TASK INFORMATION:
-- Title: {task_data.get('summary', 'N/A')}
-- Type: {task_data.get('issue_type', 'N/A')}
-- Priority: {task_data.get('priority', 'N/A')}
-- Description: {task_data.get('description', 'N/A')}
-
-ACCEPTANCE CRITERIA:
-{chr(10).join(f"- {criteria}" for criteria in task_data.get('acceptance_criteria', []))}
-
-PROJECT CONTEXT:
-- Languages: {', '.join(project_context['project_overview']['languages'])}
-- Frameworks: {', '.join(project_context['project_overview']['frameworks'])}
+        The block only depends on the project, so the last rendering is kept
+        and reused while the same context object is passed in.
+        """
+        cached = self._project_context_block
+        if cached is not None and cached[0] is project_context:
+            return cached[1]
+        
+        overview = project_context['project_overview']
+        block = f"""PROJECT CONTEXT:
+- Languages: {', '.join(overview['languages'])}
+- Frameworks: {', '.join(overview['frameworks'])}
 - Directory Structure:
 {self._format_directory_structure(project_context['directory_structure'])}
 
 IMPORTANT FILES CONTEXT:
-{self._format_important_files(project_context['important_files'])}
-
-REQUIREMENTS:
-1. Generate clean, maintainable code that follows the project's existing patterns
-2. Include proper error handling and logging
-3. Add comprehensive docstrings and comments
-4. Follow the coding standards evident in the existing codebase
-5. Create any necessary configuration or setup files
-6. Ensure the code integrates well with the existing project structure
-
-Please provide your response in the following format:
-
-## Analysis
-[Brief analysis of the requirements and approach]
-
-## Files to Create/Modify
-
-### File: path/to/file.ext
-```language
-[code content]
-```
-
-### File: path/to/another_file.ext
-```language
-[code content]
-```
-
-## Implementation Notes
-[Any important notes about the implementation]
-
-## Dependencies
-[List any new dependencies that need to be installed]
-"""
+{self._format_important_files(project_context['important_files'])}"""
         
-        return prompt
+        self._project_context_block = (project_context, block)
+        return block
     
     def _build_test_generation_prompt(self, code_files: List[Dict[str, Any]], project_context: Dict[str, Any]) -> str:
         """Build the prompt for test generation."""
         
-        code_content = ""
-        for file_info in code_files:
-            code_content += f"\n### {file_info['path']}\n```{file_info.get('language', '')}\n{file_info['content']}\n```\n"
+        code_content = "".join(
+            f"\n### {file_info['path']}\n```{file_info.get('language', '')}\n{file_info['content']}\n```\n"
+            for file_info in code_files
+        )
         
         prompt = f"""You are an expert software testing engineer. Generate comprehensive unit and integration tests for the following code.
 
@@ -264,69 +536,7 @@ Please provide the updated code with explanations of what was changed and why.
             'dependencies': []
         }
         
-        lines = response_content.split('\n')
-        current_section = None
-        current_file = None
-        current_content = []
-        
-        for line in lines:
-            line_stripped = line.strip()
-            
-            # Detect sections
-            if line_stripped.startswith('## Analysis'):
-                current_section = 'analysis'
-                continue
-            elif line_stripped.startswith('## Files to Create/Modify'):
-                current_section = 'files'
-                continue
-            elif line_stripped.startswith('## Implementation Notes'):
-                current_section = 'notes'
-                continue
-            elif line_stripped.startswith('## Dependencies'):
-                current_section = 'dependencies'
-                continue
-            
-            # Handle file definitions
-            if current_section == 'files' and line_stripped.startswith('### File:'):
-                # Save previous file if exists
-                if current_file:
-                    result['files'].append({
-                        'path': current_file,
-                        'content': '\n'.join(current_content),
-                        'language': self._detect_language_from_path(current_file)
-                    })
-                
-                # Start new file
-                current_file = line_stripped.replace('### File:', '').strip()
-                current_content = []
-                continue
-            
-            # Handle code blocks
-            if current_section == 'files' and current_file:
-                if line_stripped.startswith('```') and len(current_content) == 0:
-                    continue  # Skip opening code block
-                elif line_stripped.startswith('```') and len(current_content) > 0:
-                    continue  # Skip closing code block
-                else:
-                    current_content.append(line)
-            
-            # Handle other sections
-            elif current_section == 'analysis':
-                result['analysis'] += line + '\n'
-            elif current_section == 'notes':
-                result['notes'] += line + '\n'
-            elif current_section == 'dependencies':
-                if line_stripped and not line_stripped.startswith('#'):
-                    result['dependencies'].append(line_stripped)
-        
-        # Don't forget the last file
-        if current_file and current_content:
-            result['files'].append({
-                'path': current_file,
-                'content': '\n'.join(current_content),
-                'language': self._detect_language_from_path(current_file)
-            })
-        
+        self._parse_sections(response_content, _CODE_RESPONSE_SCHEMA, result)
         return result
     
     def _parse_test_response(self, response_content: str) -> Dict[str, Any]:
@@ -339,121 +549,97 @@ Please provide the updated code with explanations of what was changed and why.
             'run_instructions': ''
         }
         
-        lines = response_content.split('\n')
-        current_section = None
-        current_file = None
-        current_content = []
+        self._parse_sections(response_content, _TEST_RESPONSE_SCHEMA, result)
+        return result
+    
+    def _parse_code_and_test_response(self, response_content: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse a combined response into code and test results."""
         
-        for line in lines:
-            line_stripped = line.strip()
-            
-            # Detect sections
-            if line_stripped.startswith('## Test Strategy'):
-                current_section = 'strategy'
-                continue
-            elif line_stripped.startswith('## Test Files'):
-                current_section = 'files'
-                continue
-            elif line_stripped.startswith('## Test Dependencies'):
-                current_section = 'dependencies'
-                continue
-            elif line_stripped.startswith('## Running the Tests'):
-                current_section = 'instructions'
-                continue
-            
-            # Handle file definitions
-            if current_section == 'files' and line_stripped.startswith('### File:'):
-                # Save previous file if exists
-                if current_file:
-                    result['test_files'].append({
-                        'path': current_file,
-                        'content': '\n'.join(current_content),
-                        'language': self._detect_language_from_path(current_file)
-                    })
-                
-                # Start new file
-                current_file = line_stripped.replace('### File:', '').strip()
-                current_content = []
+        result = {
+            'files': [],
+            'analysis': '',
+            'notes': '',
+            'dependencies': [],
+            'test_files': [],
+            'strategy': '',
+            'test_dependencies': [],
+            'run_instructions': ''
+        }
+        
+        self._parse_sections(response_content, _CODE_AND_TEST_RESPONSE_SCHEMA, result)
+        
+        return {
+            'code': {
+                'task_key': task_data.get('key', 'unknown'),
+                'files': result['files'],
+                'analysis': result['analysis'],
+                'notes': result['notes'],
+                'dependencies': result['dependencies']
+            },
+            'tests': {
+                'test_files': result['test_files'],
+                'strategy': result['strategy'],
+                'dependencies': result['test_dependencies'],
+                'run_instructions': result['run_instructions']
+            }
+        }
+    
+    def _parse_sections(self, response_content: str, schema: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Split a response into its ``## Section`` blocks and fill ``result``.
+        
+        Args:
+            response_content: Raw response text from Claude
+            schema: Mapping of section title to ``(result_key, kind)``, where
+                kind is one of 'text', 'list' or 'files'
+            result: Dictionary to fill in place
+        """
+        headers = list(_SECTION_RE.finditer(response_content))
+        
+        for i, header in enumerate(headers):
+            if header.group(1) not in schema:
                 continue
             
-            # Handle code blocks
-            if current_section == 'files' and current_file:
-                if line_stripped.startswith('```') and len(current_content) == 0:
-                    continue  # Skip opening code block
-                elif line_stripped.startswith('```') and len(current_content) > 0:
-                    continue  # Skip closing code block
-                else:
-                    current_content.append(line)
+            key, kind = schema[header.group(1)]
+            start = header.end() + 1
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(response_content)
+            body = response_content[start:end]
             
-            # Handle other sections
-            elif current_section == 'strategy':
-                result['strategy'] += line + '\n'
-            elif current_section == 'dependencies':
-                if line_stripped and not line_stripped.startswith('#'):
-                    result['dependencies'].append(line_stripped)
-            elif current_section == 'instructions':
-                result['run_instructions'] += line + '\n'
-        
-        # Don't forget the last file
-        if current_file and current_content:
-            result['test_files'].append({
-                'path': current_file,
-                'content': '\n'.join(current_content),
-                'language': self._detect_language_from_path(current_file)
-            })
-        
-        return result
+            if kind == 'text':
+                result[key] += body
+            elif kind == 'list':
+                result[key].extend(_LIST_ITEM_RE.findall(body))
+            elif kind == 'files':
+                for path, content in _iter_file_blocks(body):
+                    result[key].append({
+                        'path': path,
+                        'content': content,
+                        'language': self._detect_language_from_path(path)
+                    })
     
     def _format_directory_structure(self, structure: Dict[str, Any], indent: int = 0) -> str:
         """Format directory structure for the prompt."""
-        result = ""
+        parts = []
+        pad = "  " * indent
         for key, value in structure.items():
-            result += "  " * indent + f"- {key}\n"
+            parts.append(f"{pad}- {key}\n")
             if isinstance(value, dict) and value:
-                result += self._format_directory_structure(value, indent + 1)
-        return result
+                parts.append(self._format_directory_structure(value, indent + 1))
+        return "".join(parts)
     
     def _format_important_files(self, files: List[Dict[str, Any]]) -> str:
         """Format important files context for the prompt."""
-        result = ""
+        parts = []
         for file_info in files:
-            result += f"### {file_info['path']}\n"
+            parts.append(f"### {file_info['path']}\n")
             if 'content_preview' in file_info:
-                result += f"```\n{file_info['content_preview']}\n```\n\n"
+                parts.append(f"```\n{file_info['content_preview']}\n```\n\n")
             elif 'error' in file_info:
-                result += f"[Error reading file: {file_info['error']}]\n\n"
-        return result
+                parts.append(f"[Error reading file: {file_info['error']}]\n\n")
+        return "".join(parts)
     
-    def _detect_language_from_path(self, file_path: str) -> str:
+    @staticmethod
+    def _detect_language_from_path(file_path: str) -> str:
         """Detect programming language from file path."""
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.cs': 'csharp',
-            '.php': 'php',
-            '.rb': 'ruby',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.swift': 'swift',
-            '.kt': 'kotlin',
-            '.scala': 'scala',
-            '.R': 'r',
-            '.sh': 'bash',
-            '.sql': 'sql',
-            '.html': 'html',
-            '.css': 'css',
-            '.scss': 'scss',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.json': 'json',
-            '.xml': 'xml',
-            '.md': 'markdown'
-        }
-        
-        import os
-        _, ext = os.path.splitext(file_path)
-        return extension_map.get(ext.lower(), 'text')
+        _, dot, ext = file_path.rpartition('/')[2].rpartition('.')
+        return _language_for_extension(ext) if dot else 'text'
@@ -1,10 +1,68 @@
 """Configuration management for the task-to-code pipeline."""
 
-import yaml
+from __future__ import annotations
+
+import json
 import os
-from typing import Dict, Any, List
+import stat
+from typing import Dict, Any, List, Optional, IO, Iterator, Tuple
 from pathlib import Path
 
+from ._config_defaults import DEFAULTS
+
+# Required configuration fields, nested as in the YAML, with their types
+_REQUIRED_FIELDS = {
+    'confluence': {'base_url': str, 'username': str, 'api_token': str},
+    'project': {'repository_path': str},
+    'anthropic': {'api_key': str},
+}
+
+
+def _validate_section(section: Any, schema: Dict[str, Any], prefix: str) -> None:
+    """Check one level of the config against the required-field schema."""
+    for key, expected in schema.items():
+        field = f"{prefix}{key}"
+        
+        if not isinstance(section, dict) or key not in section:
+            raise ValueError(f"Missing required configuration field: {field}")
+        
+        value = section[key]
+        if isinstance(expected, dict):
+            _validate_section(value, expected, f"{field}.")
+        elif not value or not isinstance(value, expected) or (
+                isinstance(value, str) and value.startswith('your-')):
+            raise ValueError(f"Please set a valid value for {field}")
+
+
+def _flatten(config: Dict[str, Any], prefix: str = '') -> Iterator[Tuple[str, Any]]:
+    """Yield every value in a nested config, including sections, by dotted key."""
+    for key, value in config.items():
+        dotted = f"{prefix}{key}"
+        yield dotted, value
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{dotted}.")
+
+
+def _load_yaml(stream: IO[str]) -> Any:
+    """
+    Parse YAML with the fastest available safe loader.
+    
+    PyYAML is imported here rather than at module level so that loading a
+    cached config never pays for it.
+    """
+    import yaml
+    
+    # Prefer the libyaml-backed loader; fall back to the pure-Python one when
+    # PyYAML was built without libyaml.
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return yaml.load(stream, Loader=loader)
+
+
+def _current_uid() -> Optional[int]:
+    """Return the user ID of the process, or None where there is none (Windows)."""
+    getuid = getattr(os, 'getuid', None)
+    return getuid() if getuid is not None else None
+
 
 class Config:
     """Configuration manager for the task-to-code pipeline."""
@@ -17,7 +75,8 @@ class Config:
             config_path: Path to the configuration YAML file
         """
         self.config_path = config_path
-        self._config = self._load_config()
+        self._config = self._apply_defaults(self._load_config())
+        self._flat = dict(_flatten(self._config))
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
@@ -29,36 +88,87 @@ class Config:
                 f"Please copy config.template.yaml to {self.config_path} and fill in your values."
             )
         
+        source_stat = config_file.stat()
+        cache_file = config_file.with_name(f".{config_file.name}.cache.json")
+        meta = {'mtime_ns': source_stat.st_mtime_ns, 'size': source_stat.st_size}
+        
+        # Don't trust (or write) a cache for a file anyone can modify, or in a
+        # directory where anyone can plant one
+        use_cache = not (source_stat.st_mode & stat.S_IWOTH
+                         or config_file.parent.stat().st_mode & stat.S_IWOTH)
+        
+        if use_cache:
+            cached = self._read_cache(cache_file, meta)
+            if cached is not None:
+                return cached
+        
         with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
+            config = _load_yaml(f)
         
         # Validate required fields
         self._validate_config(config)
+        
+        if use_cache:
+            self._write_cache(cache_file, meta, config)
         return config
     
-    def _validate_config(self, config: Dict[str, Any]) -> None:
-        """Validate that all required configuration fields are present."""
-        required_fields = [
-            'confluence.base_url',
-            'confluence.username', 
-            'confluence.api_token',
-            'project.repository_path',
-            'anthropic.api_key'
-        ]
+    @staticmethod
+    def _apply_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in optional settings the user left out with built-in defaults."""
+        merged = dict(config)
+        for section, values in DEFAULTS.items():
+            section_config = dict(values)
+            section_config.update(merged.get(section) or {})
+            merged[section] = section_config
+        return merged
+    
+    @staticmethod
+    def _read_cache(cache_file: Path, meta: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached config if it was built from the current file.
         
-        for field in required_fields:
-            keys = field.split('.')
-            current = config
-            
+        The cache is only trusted when it belongs to the current user and no
+        one else can write to it.
+        """
+        try:
+            with open(cache_file, 'r') as f:
+                cache_stat = os.fstat(f.fileno())
+                uid = _current_uid()
+                if ((uid is not None and cache_stat.st_uid != uid)
+                        or cache_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+                    return None
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(cached, dict) or cached.get('_meta') != meta:
+            return None
+        return cached.get('config')
+    
+    @staticmethod
+    def _write_cache(cache_file: Path, meta: Dict[str, int], config: Dict[str, Any]) -> None:
+        """
+        Atomically write the parsed config next to the YAML file.
+        
+        The config holds API credentials, so the cache is only readable by
+        its owner whatever the umask.
+        """
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with open(fd, 'w') as f:
+                json.dump({'_meta': meta, 'config': config}, f)
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError, ValueError):
+            # Caching is best effort (read-only dirs, non-JSON values)
             try:
-                for key in keys:
-                    current = current[key]
-                
-                if not current or current.startswith('your-'):
-                    raise ValueError(f"Please set a valid value for {field}")
-                    
-            except KeyError:
-                raise ValueError(f"Missing required configuration field: {field}")
+                os.unlink(tmp_file)
+            except OSError:
+                pass
+    
+    def _validate_config(self, config: Dict[str, Any]) -> None:
+        """Validate that all required configuration fields are present."""
+        _validate_section(config, _REQUIRED_FIELDS, '')
     
     @property
     def confluence_config(self) -> Dict[str, Any]:
@@ -91,12 +201,4 @@ class Config:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
-        current = self._config
-        
-        try:
-            for k in keys:
-                current = current[k]
-            return current
-        except KeyError:
-            return default
+        return self._flat.get(key, default)
@@ -1,10 +1,60 @@
 """Confluence and JIRA API client for extracting task data."""
 
-import requests
 import base64
-from typing import Dict, Any, Optional, List
+import functools
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Iterator, Optional, List, Union
 from urllib.parse import urljoin
-import json
+
+from . import _json
+from ._requirements import extract_acceptance_criteria
+
+# Atlas document nodes that end with a line break
+_BLOCK_NODE_TYPES = frozenset(['paragraph', 'heading', 'listItem'])
+
+# Fields returned for each issue by search_jira_issues
+_SEARCH_FIELDS = 'summary,status,assignee,issuetype,priority'
+
+# Largest page the JQL search endpoint serves
+_SEARCH_PAGE_SIZE = 100
+
+# Stack marker for a pending line break in _extract_text_from_atlas_doc
+_LINE_BREAK = object()
+
+
+@functools.lru_cache(maxsize=8)
+def _make_session(username: str, api_token: str) -> requests.Session:
+    """
+    Create an authenticated session for the credentials.
+    
+    Sessions are shared between clients using the same credentials so that
+    their pooled keep-alive connections are reused.
+    """
+    auth_b64 = base64.b64encode(f"{username}:{api_token}".encode()).decode('ascii')
+    
+    session = requests.Session()
+    session.headers.update({
+        'Authorization': f'Basic {auth_b64}',
+        'Accept': 'application/json',
+        'Content-Type': 'application/json'
+    })
+    
+    # Keep connections alive across requests and retry transient
+    # failures instead of paying for a new TLS handshake each time.
+    # POST is only used for read-only searches, so it is safe to retry.
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'POST'])
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    return session
 
 
 class ConfluenceJiraClient:
@@ -23,19 +73,8 @@ class ConfluenceJiraClient:
         self.username = username
         self.api_token = api_token
         
-        # Create authentication header
-        auth_string = f"{username}:{api_token}"
-        auth_bytes = auth_string.encode('ascii')
-        auth_b64 = base64.b64encode(auth_bytes).decode('ascii')
-        
-        self.headers = {
-            'Authorization': f'Basic {auth_b64}',
-            'Accept': 'application/json',
-            'Content-Type': 'application/json'
-        }
-        
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = _make_session(username, api_token)
+        self.headers = dict(self.session.headers)
     
     def get_confluence_page(self, page_id: str) -> Dict[str, Any]:
         """
@@ -56,27 +95,45 @@ class ConfluenceJiraClient:
         response = self.session.get(url, params=params)
         response.raise_for_status()
         
-        return response.json()
+        return _json.loads(response.content)
     
-    def get_confluence_page_content(self, page_id: str) -> str:
+    def get_confluence_page_content(self, page_id: Optional[str] = None, *,
+                                    page_data: Optional[Dict[str, Any]] = None) -> str:
         """
         Get the content of a Confluence page as plain text.
         
         Args:
             page_id: The ID of the Confluence page
+            page_data: Page data already returned by get_confluence_page,
+                to avoid fetching the page again
             
         Returns:
             Plain text content of the page
         """
-        page_data = self.get_confluence_page(page_id)
+        if page_data is None:
+            page_data = self.get_confluence_page(page_id)
         
         # Extract content from the atlas document format
         body = page_data.get('body', {})
         atlas_doc = body.get('atlas_doc_format', {})
-        content = atlas_doc.get('value', '')
         
-        # Parse the atlas document format to extract text
-        return self._extract_text_from_atlas_doc(content)
+        # The value is itself JSON-encoded; parse it once and keep the
+        # result on the page data for repeated extractions
+        doc = atlas_doc.get('_parsed')
+        if doc is None:
+            content = atlas_doc.get('value', '')
+            if isinstance(content, (str, bytes)):
+                try:
+                    doc = _json.loads(content)
+                except _json.JSONDecodeError:
+                    return self._extract_text_from_atlas_doc(content)
+            else:
+                doc = content
+            
+            if atlas_doc:
+                atlas_doc['_parsed'] = doc
+        
+        return self._extract_text_from_atlas_doc(doc)
     
     def get_jira_issue(self, issue_key: str) -> Dict[str, Any]:
         """
@@ -96,7 +153,7 @@ class ConfluenceJiraClient:
         response = self.session.get(url, params=params)
         response.raise_for_status()
         
-        return response.json()
+        return _json.loads(response.content)
     
     def get_jira_issue_details(self, issue_key: str) -> Dict[str, Any]:
         """
@@ -109,95 +166,190 @@ class ConfluenceJiraClient:
             Dictionary with formatted issue details
         """
         issue = self.get_jira_issue(issue_key)
-        fields = issue.get('fields', {})
-        rendered_fields = issue.get('renderedFields', {})
+        return self._format_issue_details(issue)
+    
+    def get_jira_issues_details(self, issue_keys: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get formatted details for several JIRA issues with a single search.
         
-        return {
-            'key': issue.get('key'),
-            'summary': fields.get('summary'),
-            'description': rendered_fields.get('description', ''),
-            'issue_type': fields.get('issuetype', {}).get('name'),
-            'priority': fields.get('priority', {}).get('name'),
-            'status': fields.get('status', {}).get('name'),
-            'assignee': fields.get('assignee', {}).get('displayName') if fields.get('assignee') else None,
-            'reporter': fields.get('reporter', {}).get('displayName') if fields.get('reporter') else None,
-            'labels': fields.get('labels', []),
-            'components': [comp.get('name') for comp in fields.get('components', [])],
-            'acceptance_criteria': self._extract_acceptance_criteria(rendered_fields.get('description', '')),
-            'subtasks': [
-                {
-                    'key': subtask.get('key'),
-                    'summary': subtask.get('fields', {}).get('summary'),
-                    'status': subtask.get('fields', {}).get('status', {}).get('name')
-                }
-                for subtask in fields.get('subtasks', [])
-            ]
+        Keys are matched case-insensitively. Issues the search doesn't
+        return under the requested key, such as ones moved to another
+        project, are fetched one by one, as are all of them when JIRA
+        rejects the search because of a key it doesn't know.
+        
+        Args:
+            issue_keys: Keys of the JIRA issues
+            
+        Returns:
+            List of formatted issue details, in the order of issue_keys
+        """
+        if not issue_keys:
+            return []
+        
+        url = f"{self.base_url}/rest/api/3/search/jql"
+        quoted_keys = ', '.join(
+            '"' + key.replace('\\', '\\\\').replace('"', '\\"') + '"' for key in issue_keys
+        )
+        payload = {
+            'jql': f"key in ({quoted_keys})",
+            'maxResults': min(len(issue_keys), _SEARCH_PAGE_SIZE),
+            'fields': ['*all'],
+            'expand': 'renderedFields,names'
         }
+        
+        details = {}
+        while True:
+            response = self.session.post(url, json=payload, stream=True)
+            page = {}
+            try:
+                response.raise_for_status()
+                for issue in _json.iter_response_items(response, 'issues', page):
+                    details[(issue.get('key') or '').upper()] = self._format_issue_details(issue)
+            except requests.HTTPError:
+                # JIRA rejects the whole query if any key doesn't exist or
+                # can't be seen, so fetch the issues one by one instead
+                if response.status_code != 400:
+                    raise
+                details = {}
+                break
+            finally:
+                response.close()
+            
+            next_page_token = page.get('nextPageToken')
+            if not next_page_token:
+                break
+            payload['nextPageToken'] = next_page_token
+        
+        return [details.get(key.upper()) or self.get_jira_issue_details(key) for key in issue_keys]
     
-    def search_jira_issues(self, jql: str, max_results: int = 50) -> List[Dict[str, Any]]:
+    def search_jira_issues(self, jql: str, max_results: int = 50) -> Iterator[Dict[str, Any]]:
         """
         Search for JIRA issues using JQL.
         
+        Results are fetched page by page as they are consumed, so stopping
+        early skips the remaining requests.
+        
         Args:
             jql: JQL query string
             max_results: Maximum number of results to return
             
+        Yields:
+            Issue dictionaries
+        """
+        url = f"{self.base_url}/rest/api/3/search/jql"
+        params = {'jql': jql, 'fields': _SEARCH_FIELDS}
+        remaining = max_results
+        
+        while remaining > 0:
+            params['maxResults'] = min(_SEARCH_PAGE_SIZE, remaining)
+            
+            response = self.session.get(url, params=params)
+            response.raise_for_status()
+            data = _json.loads(response.content)
+            
+            for issue in data.get('issues', ()):
+                yield issue
+                remaining -= 1
+                if remaining == 0:
+                    return
+            
+            next_page_token = data.get('nextPageToken')
+            if not next_page_token:
+                return
+            params['nextPageToken'] = next_page_token
+    
+    def _format_issue_details(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Format raw JIRA issue data for code generation.
+        
+        Args:
+            issue: Issue data as returned by the JIRA API
+            
         Returns:
-            List of issue dictionaries
+            Dictionary with formatted issue details
         """
-        url = f"{self.base_url}/rest/api/3/search"
-        payload = {
-            'jql': jql,
-            'maxResults': max_results,
-            'fields': ['summary', 'status', 'assignee', 'issuetype', 'priority']
-        }
+        fields = issue.get('fields') or {}
+        field = fields.get
+        description = (issue.get('renderedFields') or {}).get('description', '')
         
-        response = self.session.post(url, json=payload)
-        response.raise_for_status()
+        # Nested objects come back as null when unset, so fall back to {}
+        issue_type = field('issuetype') or {}
+        priority = field('priority') or {}
+        status = field('status') or {}
+        assignee = field('assignee') or {}
+        reporter = field('reporter') or {}
+        
+        subtasks = []
+        for subtask in field('subtasks') or ():
+            subtask_fields = subtask.get('fields') or {}
+            subtasks.append({
+                'key': subtask.get('key'),
+                'summary': subtask_fields.get('summary'),
+                'status': (subtask_fields.get('status') or {}).get('name')
+            })
         
-        result = response.json()
-        return result.get('issues', [])
+        return {
+            'key': issue.get('key'),
+            'summary': field('summary'),
+            'description': description,
+            'issue_type': issue_type.get('name'),
+            'priority': priority.get('name'),
+            'status': status.get('name'),
+            'assignee': assignee.get('displayName'),
+            'reporter': reporter.get('displayName'),
+            'labels': field('labels', []),
+            'components': [comp.get('name') for comp in field('components') or ()],
+            'acceptance_criteria': self._extract_acceptance_criteria(description or ''),
+            'subtasks': subtasks
+        }
     
-    def _extract_text_from_atlas_doc(self, atlas_content: str) -> str:
+    def _extract_text_from_atlas_doc(self, atlas_content: Union[str, Dict[str, Any]]) -> str:
         """
         Extract plain text from Confluence's Atlas Document Format.
         
         Args:
-            atlas_content: Atlas document format content as string
+            atlas_content: Atlas document format content, as a JSON string
+                or an already parsed document
             
         Returns:
             Plain text content
         """
         try:
             # Parse the atlas document format JSON
-            doc = json.loads(atlas_content) if isinstance(atlas_content, str) else atlas_content
+            doc = _json.loads(atlas_content) if isinstance(atlas_content, (str, bytes)) else atlas_content
+            
+            # Walk the tree with an explicit stack; block elements get a line
+            # break after their children, queued as a marker below them
+            parts = []
+            stack = [doc]
             
-            def extract_text_recursive(node):
-                text = ""
+            while stack:
+                node = stack.pop()
                 
-                if isinstance(node, dict):
+                if node is _LINE_BREAK:
+                    parts.append('\n')
+                
+                elif isinstance(node, dict):
+                    node_type = node.get('type')
+                    
                     # Handle text nodes
-                    if node.get('type') == 'text':
-                        text += node.get('text', '')
+                    if node_type == 'text':
+                        parts.append(node.get('text', ''))
+                    
+                    # Add line breaks for certain block elements
+                    if node_type in _BLOCK_NODE_TYPES:
+                        stack.append(_LINE_BREAK)
                     
                     # Handle other node types with content
                     if 'content' in node:
-                        for child in node['content']:
-                            text += extract_text_recursive(child)
-                    
-                    # Add line breaks for certain block elements
-                    if node.get('type') in ['paragraph', 'heading', 'listItem']:
-                        text += '\n'
+                        stack.extend(reversed(node['content']))
                 
                 elif isinstance(node, list):
-                    for item in node:
-                        text += extract_text_recursive(item)
-                
-                return text
+                    stack.extend(reversed(node))
             
-            return extract_text_recursive(doc).strip()
+            return ''.join(parts).strip()
             
-        except (json.JSONDecodeError, TypeError, KeyError):
+        except (_json.JSONDecodeError, TypeError, KeyError):
             # If parsing fails, return the content as-is or empty string
             return str(atlas_content) if atlas_content else ""
     
@@ -211,26 +363,4 @@ class ConfluenceJiraClient:
         Returns:
             List of acceptance criteria
         """
-        criteria = []
-        lines = description.split('\n')
-        
-        in_acceptance_section = False
-        for line in lines:
-            line = line.strip()
-            
-            # Look for acceptance criteria section
-            if 'acceptance criteria' in line.lower():
-                in_acceptance_section = True
-                continue
-            
-            # If we're in the acceptance criteria section
-            if in_acceptance_section:
-                # Stop if we hit another section
-                if line.startswith('#') or line.startswith('**'):
-                    break
-                
-                # Extract criteria (usually bulleted or numbered)
-                if line.startswith(('-', '*', '•')) or line[0:2].replace('.', '').isdigit():
-                    criteria.append(line.lstrip('- *•0123456789. '))
-        
-        return criteria
+        return extract_acceptance_criteria(description)
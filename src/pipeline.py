@@ -2,16 +2,39 @@
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-import json
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from . import _json
+from ._requirements import extract_requirements
 from .config import Config
 from .confluence_client import ConfluenceJiraClient
 from .project_analyzer import ProjectAnalyzer
 from .claude_generator import ClaudeCodeGenerator
 
+# Thread pool size for writing generated files
+_FILE_WRITE_WORKERS = 8
+
+# Files whose presence marks a Python project, checked before scanning the
+# repository for source files
+_PYTHON_PROJECT_MARKERS = ('pyproject.toml', 'setup.py', 'setup.cfg')
+
+
+def _write_text(path: str, content: str) -> None:
+    """Write text to a file through a large buffer to limit write() calls."""
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(content)
+
+
+def _merge_dependencies(code_result: Dict[str, Any], test_result: Dict[str, Any]) -> List[str]:
+    """Combine code and test dependencies, dropping repeats but keeping order."""
+    return list(dict.fromkeys((
+        *code_result.get('dependencies', ()),
+        *test_result.get('dependencies', ())
+    )))
+
 
 class TaskToCodePipeline:
     """Main pipeline that orchestrates the task-to-code process."""
@@ -43,9 +66,15 @@ class TaskToCodePipeline:
         self.code_generator = ClaudeCodeGenerator(
             api_key=anthropic_config['api_key'],
             model=anthropic_config.get('model', 'claude-3-5-sonnet-20241022'),
-            max_tokens=anthropic_config.get('max_tokens', 4000)
+            max_tokens=anthropic_config.get('max_tokens', 4000),
+            cache=anthropic_config.get('cache', True),
+            combined_max_tokens=anthropic_config.get('combined_max_tokens')
         )
         
+        # Project context summary, keyed by repository signature
+        self._context_cache = None
+        self._analyzed_signature = None
+        
         # Setup output directories
         self.output_config = self.config.output_config
         self._setup_output_directories()
@@ -62,34 +91,31 @@ class TaskToCodePipeline:
         """
         print(f"Processing JIRA task: {issue_key}")
         
-        # Step 1: Extract task data
+        # Steps 1 and 2: Extract task data while analyzing the project structure
         print("1. Extracting task data from JIRA...")
-        task_data = self.confluence_client.get_jira_issue_details(issue_key)
-        
-        # Step 2: Analyze project structure
         print("2. Analyzing project structure...")
-        project_context = self.project_analyzer.get_context_summary()
-        
-        # Step 3: Generate code
-        print("3. Generating code with Claude AI...")
-        code_result = self.code_generator.generate_code_from_task(task_data, project_context)
+        task_data, project_context = self._fetch_with_context(
+            self.confluence_client.get_jira_issue_details, issue_key
+        )
         
-        # Step 4: Generate tests
-        print("4. Generating tests...")
-        test_result = self.code_generator.generate_tests(code_result['files'], project_context)
+        # Step 3: Generate code and tests in a single request
+        print("3. Generating code and tests with Claude AI...")
+        generated = self.code_generator.generate_code_and_tests(task_data, project_context)
+        code_result = generated['code']
+        test_result = generated['tests']
         
-        # Step 5: Save generated files
-        print("5. Saving generated files...")
+        # Step 4: Save generated files
+        print("4. Saving generated files...")
         saved_files = self._save_generated_files(code_result, test_result, issue_key)
         
-        # Step 6: Create summary report
+        # Step 5: Create summary report
         result = {
             'issue_key': issue_key,
             'task_data': task_data,
             'generated_files': saved_files,
             'analysis': code_result.get('analysis', ''),
             'notes': code_result.get('notes', ''),
-            'dependencies': code_result.get('dependencies', []) + test_result.get('dependencies', []),
+            'dependencies': _merge_dependencies(code_result, test_result),
             'test_strategy': test_result.get('strategy', ''),
             'run_instructions': test_result.get('run_instructions', ''),
             'timestamp': datetime.now().isoformat()
@@ -101,6 +127,34 @@ class TaskToCodePipeline:
         print(f"✅ Task processing completed! Check the output directory: {self.output_config.get('generated_code_path', './generated')}")
         return result
     
+    def process_jira_tasks(self, issue_keys: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process several JIRA tasks, fetching them with a single request.
+        
+        Args:
+            issue_keys: JIRA issue keys (e.g., ['PROJ-123', 'PROJ-124'])
+            
+        Returns:
+            List of processing results, one per issue
+        """
+        if len(issue_keys) == 1:
+            return [self.process_jira_task(issue_keys[0])]
+        
+        print(f"Processing JIRA tasks: {', '.join(issue_keys)}")
+        
+        print("1. Extracting task data from JIRA...")
+        print("2. Analyzing project structure...")
+        tasks, project_context = self._fetch_with_context(
+            self.confluence_client.get_jira_issues_details, issue_keys
+        )
+        
+        results = []
+        for task_data in tasks:
+            print(f"\nProcessing JIRA task: {task_data['key']}")
+            results.append(self._process_task_data(task_data, project_context))
+        
+        return results
+    
     def process_confluence_page(self, page_id: str) -> Dict[str, Any]:
         """
         Process a Confluence page through the pipeline.
@@ -113,10 +167,13 @@ class TaskToCodePipeline:
         """
         print(f"Processing Confluence page: {page_id}")
         
-        # Step 1: Extract page content
+        # Steps 1 and 2: Extract page content while analyzing the project structure
         print("1. Extracting content from Confluence...")
-        page_data = self.confluence_client.get_confluence_page(page_id)
-        content = self.confluence_client.get_confluence_page_content(page_id)
+        print("2. Analyzing project structure...")
+        page_data, project_context = self._fetch_with_context(
+            self.confluence_client.get_confluence_page, page_id
+        )
+        content = self.confluence_client.get_confluence_page_content(page_data=page_data)
         
         # Transform to task-like format
         task_data = {
@@ -132,7 +189,7 @@ class TaskToCodePipeline:
         }
         
         # Continue with normal pipeline
-        return self._process_task_data(task_data)
+        return self._process_task_data(task_data, project_context)
     
     def update_existing_code(self, file_path: str, new_requirements: str) -> Dict[str, Any]:
         """
@@ -154,16 +211,20 @@ class TaskToCodePipeline:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         # Get project context
-        project_context = self.project_analyzer.get_context_summary()
+        project_context = self._cached_context()
         
         # Generate updated code
         updated_code = self.code_generator.review_and_update_code(
             existing_code, new_requirements, project_context
         )
         
+        # One timestamp for both the backup name and the result
+        now = datetime.now()
+        
         # Backup existing file
+        backup_path = None
         if self.output_config.get('backup_existing', True):
-            backup_path = self._create_backup(file_path)
+            backup_path = self._create_backup(file_path, now)
             print(f"Backup created: {backup_path}")
         
         # Save updated code
@@ -173,9 +234,9 @@ class TaskToCodePipeline:
         
         result = {
             'file_path': file_path,
-            'backup_path': backup_path if self.output_config.get('backup_existing', True) else None,
+            'backup_path': backup_path,
             'updated_code': updated_code,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now.isoformat()
         }
         
         print(f"✅ Code updated successfully!")
@@ -195,7 +256,11 @@ class TaskToCodePipeline:
         
         # This would typically run pytest, jest, or other test runners
         # For now, provide instructions
-        project_languages = self.project_analyzer._detect_languages()
+        repository_path = self.project_analyzer.repository_path
+        if any((repository_path / marker).is_file() for marker in _PYTHON_PROJECT_MARKERS):
+            project_languages = ['Python']
+        else:
+            project_languages = self._cached_languages()
         
         if 'Python' in project_languages:
             test_command = "pytest"
@@ -212,22 +277,82 @@ class TaskToCodePipeline:
             'timestamp': datetime.now().isoformat()
         }
     
-    def _process_task_data(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process task data through the pipeline."""
-        # Analyze project structure
-        print("2. Analyzing project structure...")
+    def _cached_context(self) -> Dict[str, Any]:
+        """
+        Get the project context summary, reusing the last one while the
+        repository is unchanged.
+        
+        Returns:
+            Project context summary
+        """
+        signature = self._refresh_analysis()
+        if self._context_cache is not None and self._context_cache[0] == signature:
+            return self._context_cache[1]
+        
         project_context = self.project_analyzer.get_context_summary()
+        self._context_cache = (signature, project_context)
+        return project_context
+    
+    def _cached_languages(self) -> List[str]:
+        """
+        Get the project languages, reusing the analyzer's last scan while
+        the repository is unchanged.
+        
+        Returns:
+            Detected languages
+        """
+        self._refresh_analysis()
+        return self.project_analyzer.get_project_structure()['languages']
+    
+    def _refresh_analysis(self) -> Tuple[int, int]:
+        """
+        Drop the analyzer's cached scan if the repository changed since it
+        was taken.
+        
+        Returns:
+            Current modification signature of the repository
+        """
+        signature = self.project_analyzer.get_modification_signature()
+        if signature != self._analyzed_signature:
+            self.project_analyzer.invalidate_cache()
+            self._analyzed_signature = signature
+        return signature
+    
+    def _fetch_with_context(self, fetch: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Run a remote fetch and the project analysis concurrently.
+        
+        The fetch is network-bound and the analysis filesystem-bound, so
+        overlapping them hides one behind the other.
         
-        # Generate code
-        print("3. Generating code with Claude AI...")
-        code_result = self.code_generator.generate_code_from_task(task_data, project_context)
+        Args:
+            fetch: Client method that retrieves the task data
+            *args: Arguments for the fetch
+            
+        Returns:
+            Tuple of the fetch result and the project context summary
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fetched = executor.submit(fetch, *args)
+            project_context = executor.submit(self._cached_context)
+            return fetched.result(), project_context.result()
+    
+    def _process_task_data(self, task_data: Dict[str, Any],
+                           project_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Process task data through the pipeline."""
+        # Analyze project structure, unless the caller already did
+        if project_context is None:
+            print("2. Analyzing project structure...")
+            project_context = self._cached_context()
         
-        # Generate tests
-        print("4. Generating tests...")
-        test_result = self.code_generator.generate_tests(code_result['files'], project_context)
+        # Generate code and tests in a single request
+        print("3. Generating code and tests with Claude AI...")
+        generated = self.code_generator.generate_code_and_tests(task_data, project_context)
+        code_result = generated['code']
+        test_result = generated['tests']
         
         # Save generated files
-        print("5. Saving generated files...")
+        print("4. Saving generated files...")
         saved_files = self._save_generated_files(code_result, test_result, task_data['key'])
         
         # Create summary report
@@ -237,7 +362,7 @@ class TaskToCodePipeline:
             'generated_files': saved_files,
             'analysis': code_result.get('analysis', ''),
             'notes': code_result.get('notes', ''),
-            'dependencies': code_result.get('dependencies', []) + test_result.get('dependencies', []),
+            'dependencies': _merge_dependencies(code_result, test_result),
             'test_strategy': test_result.get('strategy', ''),
             'run_instructions': test_result.get('run_instructions', ''),
             'timestamp': datetime.now().isoformat()
@@ -259,43 +384,44 @@ class TaskToCodePipeline:
     
     def _save_generated_files(self, code_result: Dict[str, Any], test_result: Dict[str, Any], issue_key: str) -> List[Dict[str, str]]:
         """Save generated files to the output directory."""
-        saved_files = []
+        issue_dir = str(Path(self.output_config.get('generated_code_path', './generated')) / issue_key)
+        join = os.path.join
+        
+        # Resolve every destination first so each directory is created once;
+        # plain string joins keep this loop free of Path allocations
+        to_save = [
+            (file_type, file_info, join(issue_dir, subdir, file_info['path']))
+            for file_type, subdir, files in (
+                ('code', 'code', code_result.get('files', [])),
+                ('test', 'tests', test_result.get('test_files', []))
+            )
+            for file_info in files
+        ]
+        
+        os.makedirs(issue_dir, exist_ok=True)
+        for directory in {os.path.dirname(file_path) for _, _, file_path in to_save}:
+            os.makedirs(directory, exist_ok=True)
+        
+        # A path the model emitted twice is written once, with its last
+        # content, so no two threads write the same file
+        contents = {
+            os.path.normpath(file_path): file_info['content']
+            for _, file_info, file_path in to_save
+        }
         
-        # Create issue-specific directory
-        issue_dir = Path(self.output_config.get('generated_code_path', './generated')) / issue_key
-        issue_dir.mkdir(parents=True, exist_ok=True)
+        # Writes are independent and I/O-bound, so overlap them
+        with ThreadPoolExecutor(max_workers=_FILE_WRITE_WORKERS) as executor:
+            list(executor.map(lambda item: _write_text(*item), contents.items()))
         
-        # Save code files
-        for file_info in code_result.get('files', []):
-            file_path = issue_dir / 'code' / file_info['path']
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(file_info['content'])
-            
-            saved_files.append({
-                'type': 'code',
-                'original_path': file_info['path'],
-                'saved_path': str(file_path),
-                'language': file_info.get('language', 'text')
-            })
-        
-        # Save test files
-        for file_info in test_result.get('test_files', []):
-            file_path = issue_dir / 'tests' / file_info['path']
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(file_info['content'])
-            
-            saved_files.append({
-                'type': 'test',
+        return [
+            {
+                'type': file_type,
                 'original_path': file_info['path'],
-                'saved_path': str(file_path),
+                'saved_path': file_path,
                 'language': file_info.get('language', 'text')
-            })
-        
-        return saved_files
+            }
+            for file_type, file_info, file_path in to_save
+        ]
     
     def _save_summary_report(self, result: Dict[str, Any]):
         """Save a summary report of the processing."""
@@ -303,7 +429,7 @@ class TaskToCodePipeline:
         report_path = Path(self.output_config.get('generated_code_path', './generated')) / issue_key / 'summary.json'
         
         with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+            f.write(_json.dumps_pretty(result))
         
         # Also create a markdown report
         md_path = report_path.with_suffix('.md')
@@ -314,7 +440,7 @@ class TaskToCodePipeline:
         """Create a markdown report from the results."""
         task_data = result['task_data']
         
-        report = f"""# Task Processing Report: {result['issue_key']}
+        parts = [f"""# Task Processing Report: {result['issue_key']}
 
 **Generated on:** {result['timestamp']}
 
@@ -328,28 +454,26 @@ class TaskToCodePipeline:
 {task_data.get('description', 'No description available')}
 
 ## Acceptance Criteria
-"""
-        
-        for criteria in task_data.get('acceptance_criteria', []):
-            report += f"- {criteria}\n"
+"""]
+        parts.extend(f"- {criteria}\n" for criteria in task_data.get('acceptance_criteria', []))
         
-        report += f"""
+        parts.append(f"""
 ## Analysis
 {result.get('analysis', 'No analysis available')}
 
 ## Generated Files
-"""
-        
-        for file_info in result.get('generated_files', []):
-            report += f"- **{file_info['type'].title()}:** `{file_info['original_path']}` → `{file_info['saved_path']}`\n"
+""")
+        parts.extend(
+            f"- **{file_info['type'].title()}:** `{file_info['original_path']}` → `{file_info['saved_path']}`\n"
+            for file_info in result.get('generated_files', [])
+        )
         
-        report += f"""
+        parts.append("""
 ## Dependencies
-"""
-        for dep in result.get('dependencies', []):
-            report += f"- {dep}\n"
+""")
+        parts.extend(f"- {dep}\n" for dep in result.get('dependencies', []))
         
-        report += f"""
+        parts.append(f"""
 ## Test Strategy
 {result.get('test_strategy', 'No test strategy available')}
 
@@ -358,40 +482,25 @@ class TaskToCodePipeline:
 
 ## Implementation Notes
 {result.get('notes', 'No additional notes')}
-"""
+""")
         
-        return report
+        return ''.join(parts)
     
     def _extract_requirements_from_content(self, content: str) -> List[str]:
         """Extract requirements from Confluence page content."""
-        requirements = []
-        lines = content.split('\n')
-        
-        in_requirements = False
-        for line in lines:
-            line = line.strip()
-            
-            if any(keyword in line.lower() for keyword in ['requirements', 'acceptance criteria', 'should', 'must']):
-                in_requirements = True
-                continue
-            
-            if in_requirements:
-                if line.startswith(('-', '*', '•')) or line[0:2].replace('.', '').isdigit():
-                    requirements.append(line.lstrip('- *•0123456789. '))
-                elif line and not any(c.isalnum() for c in line):
-                    break  # End of requirements section
-        
-        return requirements
+        return extract_requirements(content)
     
-    def _create_backup(self, file_path: str) -> str:
-        """Create a backup of an existing file."""
+    def _create_backup(self, file_path: str, now: Optional[datetime] = None) -> str:
+        """Create a backup of an existing file, named after ``now`` (default: current time)."""
         full_path = Path(self.config.project_config['repository_path']) / file_path
         
         if not full_path.exists():
             raise FileNotFoundError(f"Cannot backup non-existent file: {file_path}")
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
         backup_path = full_path.with_suffix(f".backup_{timestamp}{full_path.suffix}")
         
-        shutil.copy2(full_path, backup_path)
+        # Content only: backups don't need the original metadata, and copyfile
+        # takes the kernel zero-copy path on Linux
+        shutil.copyfile(full_path, backup_path)
         return str(backup_path)
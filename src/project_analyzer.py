@@ -1,11 +1,212 @@
 """Project structure analyzer for gathering context about the codebase."""
 
+import functools
+import heapq
+import mmap
 import os
+import re
 import pathspec
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Pattern, Tuple, Union
 import fnmatch
 
+# Whether directories can be listed through a file descriptor (POSIX)
+_SCANDIR_ACCEPTS_FD = os.scandir in os.supports_fd
+
+_DIRECTORY_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+
+# Thread pool size for keyword scans; file reads release the GIL
+_CONTENT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+# Number of paths whose exclusion result is remembered per analyzer
+_EXCLUDE_CACHE_SIZE = 1 << 16
+
+# Only the head of a file is searched for keywords, so one huge generated
+# file can't dominate a scan
+_MAX_SCAN_BYTES = 1 << 20
+
+# Largest file whose content get_file_content keeps cached
+_MAX_CACHED_READ_BYTES = 256 * 1024
+
+# A NUL byte this close to the start marks a file as binary, as in grep
+_BINARY_SNIFF_BYTES = 512
+
+# Extensions of files whose contents are searched for keywords
+_TEXT_EXTS = frozenset([
+    '.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.md', '.txt', '.yml', '.yaml', '.json'
+])
+
+# Languages by file extension
+_LANGUAGE_EXTENSIONS = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.cs': 'C#',
+    '.php': 'PHP',
+    '.rb': 'Ruby',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.swift': 'Swift',
+    '.kt': 'Kotlin',
+    '.scala': 'Scala',
+    '.R': 'R',
+    '.m': 'Objective-C',
+    '.sh': 'Shell',
+    '.sql': 'SQL'
+}
+
+# Frameworks to look for in each indicator file at the repository root
+_FRAMEWORK_INDICATORS = {
+    'package.json': ('React', 'Angular', 'Vue', 'Express', 'Next.js'),
+    'requirements.txt': ('Django', 'Flask', 'FastAPI', 'Pandas', 'NumPy'),
+    'pom.xml': ('Spring', 'Maven'),
+    'build.gradle': ('Spring', 'Gradle'),
+    'Gemfile': ('Rails', 'Sinatra'),
+    'composer.json': ('Laravel', 'Symfony'),
+    'Cargo.toml': ('Rust',),
+    'go.mod': ('Go',)
+}
+
+# Lowercase spelling of each framework, as searched for in indicator files
+_FRAMEWORK_NAMES_LOWER = {
+    framework: framework.lower()
+    for frameworks in _FRAMEWORK_INDICATORS.values()
+    for framework in frameworks
+}
+
+# Names (lowercase globs) of the files that best describe a project, as
+# one regex
+_IMPORTANT_FILE_RE = re.compile('|'.join(fnmatch.translate(pattern) for pattern in [
+    'readme*', 'license*', 'package.json', 'requirements.txt',
+    'setup.py', 'pyproject.toml', 'pom.xml', 'build.gradle',
+    'dockerfile', 'docker-compose*', 'makefile', '.gitignore',
+    'main.*', 'app.*', 'index.*', '__init__.py', 'config.*'
+]))
+
+# Patterns without wildcards or slashes, which match any path component
+# equal to them, e.g. "node_modules"
+_LITERAL_NAME_RE = re.compile(r'[^*?\[\\/!#\s][^*?\[\\/\s]*')
+
+# Named groups in pathspec's pattern regexes, which can't repeat in one regex
+_NAMED_GROUP_RE = re.compile(r'\(\?P<\w+>')
+
+
+def _join_regexes(patterns: List[Any]) -> Pattern:
+    """Join pattern regexes into one alternation that never matches when empty."""
+    alternatives = [f"(?:{_NAMED_GROUP_RE.sub('(?:', p.regex.pattern)})" for p in patterns]
+    return re.compile('|'.join(alternatives) or r'(?!)')
+
+
+def _combine_patterns(patterns: List[Any]) -> Optional[Tuple[frozenset, Pattern, Pattern]]:
+    """
+    Combine gitwildmatch patterns into a set of literal names plus one regex
+    for the remaining excluded paths and one for re-included (negated) paths.
+    
+    Args:
+        patterns: Patterns of a pathspec.PathSpec
+        
+    Returns:
+        Tuple of (literal names, exclude regex, re-include regex), or None
+        when an exclude pattern follows a negation, where only pattern order
+        decides
+    """
+    literal_names = set()
+    excludes = []
+    reincludes = []
+    for pattern in patterns:
+        if pattern.include is None:
+            continue  # Comment
+        if not pattern.include:
+            reincludes.append(pattern)
+        elif reincludes:
+            return None
+        elif _LITERAL_NAME_RE.fullmatch(pattern.pattern):
+            literal_names.add(pattern.pattern)
+        else:
+            excludes.append(pattern)
+    
+    return frozenset(literal_names), _join_regexes(excludes), _join_regexes(reincludes)
+
+
+def _file_extension(name: str) -> str:
+    """Return the extension of a file name as Path.suffix does ('' for "foo.")."""
+    extension = os.path.splitext(name)[1]
+    return '' if extension == '.' else extension
+
+
+def _keyword_regex(keywords: List[str]) -> Optional[Pattern]:
+    """
+    Compile one case-insensitive bytes regex matching any of the keywords.
+    
+    Returns None if a keyword isn't ASCII, since bytes regexes only fold
+    ASCII case.
+    """
+    try:
+        alternatives = [re.escape(keyword.lower().encode('ascii')) for keyword in keywords]
+    except UnicodeEncodeError:
+        return None
+    return re.compile(b'|'.join(alternatives), re.IGNORECASE)
+
+
+def _file_contains_keyword(path: str, keywords: List[str], keyword_re: Optional[Pattern],
+                           max_scan_bytes: int = _MAX_SCAN_BYTES) -> bool:
+    """
+    Check whether a text file mentions any of the (lowercase) keywords.
+    
+    The file is memory-mapped and scanned once for all keywords, without
+    decoding or lowercasing a copy of it. Only the first max_scan_bytes are
+    searched, and files that look binary (a NUL byte near the start) are
+    skipped.
+    
+    Args:
+        path: Path of the file
+        keywords: Lowercase keywords
+        keyword_re: Regex from _keyword_regex, or None to decode the text
+        max_scan_bytes: Number of bytes from the start of the file to search
+        
+    Returns:
+        True if a keyword occurs in the scanned part of the file
+    """
+    if keyword_re is None:
+        with open(path, 'rb') as f:
+            head = f.read(max_scan_bytes)
+        if b'\0' in head[:_BINARY_SNIFF_BYTES]:
+            return False
+        content = head.decode('utf-8', errors='ignore').lower()
+        return any(keyword in content for keyword in keywords)
+    
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False  # Empty files can't be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped.find(b'\0', 0, _BINARY_SNIFF_BYTES) != -1:
+                return False
+            return keyword_re.search(mapped, 0, max_scan_bytes) is not None
+
+
+def _read_text(path: str) -> str:
+    """Read a text file, falling back to latin-1 when it isn't valid UTF-8."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        # Try with different encoding for binary files
+        with open(path, 'r', encoding='latin-1') as f:
+            return f.read()
+
+
+@functools.lru_cache(maxsize=64)
+def _read_text_cached(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Read a text file through a cache keyed on the path together with its
+    modification time and size, so a changed file is read again.
+    """
+    return _read_text(path)
+
 
 class ProjectAnalyzer:
     """Analyzes project structure and extracts relevant context."""
@@ -27,14 +228,31 @@ class ProjectAnalyzer:
         
         # Create pathspec for pattern matching
         self.spec = pathspec.PathSpec.from_lines('gitwildmatch', self.exclude_patterns)
+        
+        # Check all patterns with set lookups and one regex search instead
+        # of one regex per pattern
+        self._exclude_regexes = _combine_patterns(self.spec.patterns)
+        
+        # The same paths come back on every walk, e.g. for the modification
+        # signature, so remember the result per path
+        self._is_excluded = functools.lru_cache(maxsize=_EXCLUDE_CACHE_SIZE)(self._match_exclude_patterns)
+        
+        # Result of the last full scan, reused until invalidate_cache()
+        self._structure_cache = None
     
     def get_project_structure(self) -> Dict[str, Any]:
         """
         Get the complete project structure.
         
+        The repository is scanned once and the result reused by later calls;
+        use invalidate_cache() after the tree changes.
+        
         Returns:
             Dictionary containing project structure information
         """
+        if self._structure_cache is not None:
+            return self._structure_cache
+        
         if not self.repository_path.exists():
             raise FileNotFoundError(f"Repository path does not exist: {self.repository_path}")
         
@@ -42,89 +260,79 @@ class ProjectAnalyzer:
             'root_path': str(self.repository_path),
             'directories': [],
             'files': [],
-            'file_tree': self._build_file_tree(),
-            'languages': self._detect_languages(),
-            'frameworks': self._detect_frameworks(),
+            'file_tree': [],
+            'languages': [],
+            'frameworks': [],
             'total_files': 0,
             'total_directories': 0
         }
+        self._scan_repository(structure)
         
-        # Walk through the directory structure
-        for root, dirs, files in os.walk(self.repository_path):
-            root_path = Path(root)
-            relative_root = root_path.relative_to(self.repository_path)
-            
-            # Filter out excluded directories
-            dirs[:] = [d for d in dirs if not self._should_exclude(relative_root / d)]
-            
-            # Add directory info
-            if not self._should_exclude(relative_root):
-                structure['directories'].append({
-                    'path': str(relative_root),
-                    'absolute_path': str(root_path),
-                    'file_count': len([f for f in files if not self._should_exclude(relative_root / f)])
-                })
-                structure['total_directories'] += 1
-            
-            # Add file info
-            for file in files:
-                file_path = relative_root / file
-                if not self._should_exclude(file_path):
-                    structure['files'].append({
-                        'path': str(file_path),
-                        'absolute_path': str(root_path / file),
-                        'extension': Path(file).suffix,
-                        'size': (root_path / file).stat().st_size,
-                        'name': file
-                    })
-                    structure['total_files'] += 1
-        
+        self._structure_cache = structure
         return structure
     
-    def get_relevant_files(self, keywords: List[str], file_extensions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def invalidate_cache(self):
+        """Forget the cached project structure so the next call rescans."""
+        self._structure_cache = None
+    
+    def get_relevant_files(self, keywords: List[str], file_extensions: Optional[List[str]] = None,
+                           max_scan_bytes: int = _MAX_SCAN_BYTES) -> List[Dict[str, Any]]:
         """
         Get files that are relevant to the given keywords.
         
         Args:
             keywords: List of keywords to search for
             file_extensions: List of file extensions to filter by
+            max_scan_bytes: Number of bytes at the start of each file searched
+                for the keywords
             
         Returns:
             List of relevant file information
         """
         relevant_files = []
-        structure = self.get_project_structure()
         
-        for file_info in structure['files']:
-            file_path = Path(file_info['absolute_path'])
+        if not keywords:
+            return relevant_files
+        
+        keywords = [keyword.lower() for keyword in keywords]
+        keyword_re = _keyword_regex(keywords)
+        
+        # Name matches are settled here; text files that didn't match by
+        # name are queued for a content scan
+        candidates = []
+        to_scan = []
+        for file_info in self._iter_files():
+            extension = file_info['extension']
             
             # Filter by extension if specified
-            if file_extensions and file_info['extension'] not in file_extensions:
+            if file_extensions and extension not in file_extensions:
                 continue
             
-            # Check if file is relevant based on keywords
-            is_relevant = False
-            
             # Check filename
-            for keyword in keywords:
-                if keyword.lower() in file_info['name'].lower():
-                    is_relevant = True
-                    break
+            name = file_info['name'].lower()
+            if any(keyword in name for keyword in keywords):
+                candidates.append((file_info, True))
             
             # Check file content for keywords (for text files only)
-            if not is_relevant:
-                try:
-                    if file_path.suffix in ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.md', '.txt', '.yml', '.yaml', '.json']:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read().lower()
-                            for keyword in keywords:
-                                if keyword.lower() in content:
-                                    is_relevant = True
-                                    break
-                except (IOError, UnicodeDecodeError):
-                    continue
-            
-            if is_relevant:
+            elif extension in _TEXT_EXTS:
+                candidates.append((file_info, False))
+                to_scan.append(file_info['absolute_path'])
+        
+        def scan(path: str) -> bool:
+            try:
+                return _file_contains_keyword(path, keywords, keyword_re, max_scan_bytes)
+            except (OSError, ValueError):
+                return False
+        
+        # Scans are I/O-bound, so overlap them; results keep the file order
+        scanned = []
+        if to_scan:
+            with ThreadPoolExecutor(max_workers=_CONTENT_SCAN_WORKERS) as executor:
+                scanned = list(executor.map(scan, to_scan))
+        
+        scan_results = iter(scanned)
+        for file_info, name_matched in candidates:
+            if name_matched or next(scan_results):
                 relevant_files.append(file_info)
         
         return relevant_files
@@ -139,18 +347,17 @@ class ProjectAnalyzer:
         Returns:
             File content as string
         """
-        full_path = self.repository_path / file_path
-        
-        if not full_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+        full_path = str(self.repository_path / file_path)
         
         try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding for binary files
-            with open(full_path, 'r', encoding='latin-1') as f:
-                return f.read()
+            stat = os.stat(full_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_path}") from None
+        
+        # Large files are read afresh rather than kept alive in the cache
+        if stat.st_size > _MAX_CACHED_READ_BYTES:
+            return _read_text(full_path)
+        return _read_text_cached(full_path, stat.st_mtime_ns, stat.st_size)
     
     def get_context_summary(self, max_files: int = 20) -> Dict[str, Any]:
         """
@@ -196,106 +403,280 @@ class ProjectAnalyzer:
         
         return context
     
-    def _should_exclude(self, path: Path) -> bool:
-        """Check if a path should be excluded based on patterns."""
-        return self.spec.match_file(str(path))
+    def get_modification_signature(self) -> Tuple[int, int]:
+        """
+        Get a cheap fingerprint of the repository contents.
+        
+        Only stats entries (no file reads), so it is much cheaper than
+        re-analyzing and can be used to tell whether cached results are stale.
+        
+        Returns:
+            Tuple of (number of entries, newest modification time in ns)
+        """
+        count = 0
+        latest = self.repository_path.stat().st_mtime_ns
+        
+        # Directory mtimes change when entries are added or removed
+        for _, entry in self._scandir_walk():
+            try:
+                mtime = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            count += 1
+            latest = max(latest, mtime)
+        
+        return count, latest
     
-    def _build_file_tree(self) -> Dict[str, Any]:
-        """Build a nested dictionary representing the file tree."""
-        tree = {}
+    def _scandir_walk(self, relative_root: str = '', directory: Optional[str] = None,
+                      recursive: bool = True, dir_fd: Optional[int] = None) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Walk the repository with os.scandir, skipping excluded entries.
+        
+        Yields the directories and then the files of each directory before
+        descending, in the same order as os.walk. Entries carry the file type
+        from the directory listing, so callers don't stat them to tell
+        files from directories. Exclusion is checked on the name alone,
+        before an entry is even typed, so excluded directories cost nothing
+        beyond their line in the parent's listing.
         
-        for root, dirs, files in os.walk(self.repository_path):
-            root_path = Path(root)
-            relative_root = root_path.relative_to(self.repository_path)
+        Where os.scandir accepts file descriptors, each directory is listed
+        through an open descriptor, as os.fwalk does, so entry.stat() and
+        opening subdirectories resolve a single name instead of a full path.
+        
+        Relative paths are plain slash-separated strings, with '' for the
+        repository root, so no Path objects are built per entry.
+        
+        Args:
+            relative_root: Directory to walk, relative to the repository root
+            directory: Path of that directory, if already known
+            recursive: Whether to descend into subdirectories
+            dir_fd: Descriptor of the parent directory that directory is
+                relative to
             
-            # Filter excluded items
-            dirs[:] = [d for d in dirs if not self._should_exclude(relative_root / d)]
-            files = [f for f in files if not self._should_exclude(relative_root / f)]
+        Yields:
+            Tuples of (directory relative to the repository root, entry)
+        """
+        if directory is None:
+            directory = str(self.repository_path / relative_root)
+        
+        fd = None
+        try:
+            if _SCANDIR_ACCEPTS_FD:
+                fd = os.open(directory, _DIRECTORY_OPEN_FLAGS, dir_fd=dir_fd)
+            with os.scandir(directory if fd is None else fd) as it:
+                entries = list(it)
+        except OSError:
+            if fd is not None:
+                os.close(fd)
+            return
+        
+        # The descriptor stays open while entries are yielded, since their
+        # stat() calls are made relative to it
+        try:
+            prefix = relative_root + '/' if relative_root else ''
+            is_excluded = self._is_excluded
             
-            if self._should_exclude(relative_root):
-                continue
+            dirs = []
+            files = []
+            for entry in entries:
+                if is_excluded(prefix + entry.name):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append(entry)
+            
+            for entry in dirs:
+                yield relative_root, entry
+            for entry in files:
+                yield relative_root, entry
             
-            # Build nested structure
-            current = tree
-            if str(relative_root) != '.':
-                for part in relative_root.parts:
-                    if part not in current:
-                        current[part] = {}
-                    current = current[part]
+            if not recursive:
+                return
             
-            # Add files and directories
-            for d in dirs:
-                if d not in current:
-                    current[d] = {}
+            # Like os.walk, don't follow symlinked directories. Entries listed
+            # through a descriptor have just their name as path.
+            for entry in dirs:
+                if not entry.is_symlink():
+                    yield from self._scandir_walk(prefix + entry.name, entry.path, dir_fd=fd)
+        finally:
+            if fd is not None:
+                os.close(fd)
+    
+    def _iter_files(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the repository's files without analyzing the structure.
+        
+        Files come from the cached structure when there is one; otherwise
+        they are listed straight from a walk, skipping the file tree,
+        language and framework detection that get_project_structure does.
+        
+        Yields:
+            File information dictionaries, in the order of the structure's
+            files
+        """
+        if self._structure_cache is not None:
+            yield from self._structure_cache['files']
+            return
+        
+        if not self.repository_path.exists():
+            raise FileNotFoundError(f"Repository path does not exist: {self.repository_path}")
+        
+        root_path = str(self.repository_path)
+        absolute_prefix = '' if root_path == '.' else os.path.join(root_path, '')
+        
+        for relative_root, entry in self._scandir_walk():
+            if entry.is_dir():
+                continue
             
-            for f in files:
-                current[f] = None  # Files are leaf nodes
+            name = entry.name
+            path = relative_root + '/' + name if relative_root else name
+            yield {
+                'path': path,
+                'absolute_path': absolute_prefix + path,
+                'extension': _file_extension(name),
+                'size': entry.stat().st_size,
+                'name': name
+            }
+    
+    def _should_exclude(self, path: Union[str, Path]) -> bool:
+        """Check if a path should be excluded based on patterns."""
+        if not isinstance(path, str):
+            path = path.as_posix()
+        return self._is_excluded(path)
+    
+    def _match_exclude_patterns(self, path: str) -> bool:
+        """Match a slash-separated relative path against the exclude patterns."""
+        if self._exclude_regexes is None:
+            return self.spec.match_file(path)
+        
+        literal_names, exclude_re, reinclude_re = self._exclude_regexes
         
-        return tree
+        # Set lookups settle the common literal-name patterns without a regex
+        if literal_names.isdisjoint(path.split('/')) and exclude_re.match(path) is None:
+            return False
+        
+        return reinclude_re.match(path) is None
     
-    def _detect_languages(self) -> List[str]:
-        """Detect programming languages used in the project."""
-        languages = set()
-        
-        language_extensions = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.ts': 'TypeScript',
-            '.java': 'Java',
-            '.cpp': 'C++',
-            '.c': 'C',
-            '.cs': 'C#',
-            '.php': 'PHP',
-            '.rb': 'Ruby',
-            '.go': 'Go',
-            '.rs': 'Rust',
-            '.swift': 'Swift',
-            '.kt': 'Kotlin',
-            '.scala': 'Scala',
-            '.R': 'R',
-            '.m': 'Objective-C',
-            '.sh': 'Shell',
-            '.sql': 'SQL'
+    def _scan_repository(self, structure: Dict[str, Any]):
+        """
+        Walk the repository once, filling in the directories, files, file
+        tree, languages and frameworks of the structure.
+        """
+        extensions = set()
+        
+        root_path = str(self.repository_path)
+        root_record = {
+            'path': '.',
+            'absolute_path': root_path,
+            'file_count': 0
         }
+        structure['directories'].append(root_record)
+        
+        # Absolute paths are built by string concatenation, matching what
+        # joining Paths would give (no "./" for a repository path of ".")
+        absolute_prefix = '' if root_path == '.' else os.path.join(root_path, '')
         
-        for root, dirs, files in os.walk(self.repository_path):
-            root_path = Path(root)
-            relative_root = root_path.relative_to(self.repository_path)
+        # Per-directory state, keyed by relative path: directory record and
+        # (name, is_dir) entries for the file tree
+        records = {'': root_record}
+        children = {'': []}
+        
+        current_root = None
+        for relative_root, entry in self._scandir_walk():
+            # Entries arrive grouped by directory, so look up the directory's
+            # state once rather than for every entry
+            if relative_root != current_root:
+                current_root = relative_root
+                prefix = relative_root + '/' if relative_root else ''
+                current = children[relative_root]
+                record = records[relative_root]
+            
+            name = entry.name
+            path = prefix + name
             
-            if self._should_exclude(relative_root):
+            if entry.is_dir():
+                current.append((name, True))
+                
+                # Symlinked directories are listed but not descended into
+                if not entry.is_symlink():
+                    children[path] = []
+                    records[path] = {
+                        'path': path,
+                        'absolute_path': absolute_prefix + path,
+                        'file_count': 0
+                    }
                 continue
             
-            for file in files:
-                file_path = relative_root / file
-                if not self._should_exclude(file_path):
-                    ext = Path(file).suffix.lower()
-                    if ext in language_extensions:
-                        languages.add(language_extensions[ext])
-        
-        return sorted(list(languages))
+            # Add file info, reusing the directory entry for the size
+            extension = _file_extension(name)
+            structure['files'].append({
+                'path': path,
+                'absolute_path': absolute_prefix + path,
+                'extension': extension,
+                'size': entry.stat().st_size,
+                'name': name
+            })
+            record['file_count'] += 1
+            current.append((name, False))
+            extensions.add(extension.lower())
+        
+        # Languages and frameworks come from what the walk already found
+        structure['languages'] = sorted({
+            _LANGUAGE_EXTENSIONS[ext] for ext in extensions if ext in _LANGUAGE_EXTENSIONS
+        })
+        structure['file_tree'] = self._flatten_tree(children)
+        
+        # Directories are listed before the walk enters them, so their records
+        # are ordered afterwards, following the tree's preorder as os.walk does
+        path_parts = []
+        for depth, name, is_dir in structure['file_tree']:
+            if is_dir:
+                del path_parts[depth:]
+                path_parts.append(name)
+                record = records.get('/'.join(path_parts))
+                if record is not None:  # Not a symlinked directory
+                    structure['directories'].append(record)
+        
+        root_files = [name for name, is_dir in children[''] if not is_dir]
+        structure['frameworks'] = self._detect_frameworks(root_files)
+        structure['total_files'] = len(structure['files'])
+        structure['total_directories'] = len(structure['directories'])
     
-    def _detect_frameworks(self) -> List[str]:
-        """Detect frameworks and libraries used in the project."""
+    def _detect_frameworks(self, root_files: Optional[List[str]] = None) -> List[str]:
+        """
+        Detect frameworks and libraries used in the project.
+        
+        Args:
+            root_files: Names of the files at the repository root, if a walk
+                already listed them; otherwise only the root is listed
+            
+        Returns:
+            Detected frameworks
+        """
         frameworks = set()
         
-        # Check for common framework indicators
-        framework_indicators = {
-            'package.json': ['React', 'Angular', 'Vue', 'Express', 'Next.js'],
-            'requirements.txt': ['Django', 'Flask', 'FastAPI', 'Pandas', 'NumPy'],
-            'pom.xml': ['Spring', 'Maven'],
-            'build.gradle': ['Spring', 'Gradle'],
-            'Gemfile': ['Rails', 'Sinatra'],
-            'composer.json': ['Laravel', 'Symfony'],
-            'Cargo.toml': ['Rust'],
-            'go.mod': ['Go']
-        }
+        # Only open the indicator files that are actually there
+        if root_files is None:
+            root_files = [
+                entry.name for _, entry in self._scandir_walk(recursive=False)
+                if not entry.is_dir()
+            ]
+        root_files = set(root_files)
         
-        for indicator_file, possible_frameworks in framework_indicators.items():
+        for indicator_file, possible_frameworks in _FRAMEWORK_INDICATORS.items():
+            # Excluded files are left out of the walk but still describe the
+            # project, so those are looked for directly
+            if indicator_file not in root_files and not self._should_exclude(indicator_file):
+                continue
+            
             try:
                 content = self.get_file_content(indicator_file).lower()
-                for framework in possible_frameworks:
-                    if framework.lower() in content:
-                        frameworks.add(framework)
+                frameworks.update(
+                    framework for framework in possible_frameworks
+                    if _FRAMEWORK_NAMES_LOWER[framework] in content
+                )
             except FileNotFoundError:
                 continue
         
@@ -303,46 +684,72 @@ class ProjectAnalyzer:
     
     def _get_important_files(self, files: List[Dict[str, Any]], max_files: int) -> List[Dict[str, Any]]:
         """Get the most important files for understanding the project."""
-        important_patterns = [
-            'readme*', 'license*', 'package.json', 'requirements.txt',
-            'setup.py', 'pyproject.toml', 'pom.xml', 'build.gradle',
-            'dockerfile', 'docker-compose*', 'makefile', '.gitignore',
-            'main.*', 'app.*', 'index.*', '__init__.py', 'config.*'
-        ]
-        
         important_files = []
         regular_files = []
         
         for file_info in files:
-            file_name = file_info['name'].lower()
-            is_important = any(fnmatch.fnmatch(file_name, pattern) for pattern in important_patterns)
-            
-            if is_important:
+            if _IMPORTANT_FILE_RE.match(file_info['name'].lower()):
                 important_files.append(file_info)
             else:
                 regular_files.append(file_info)
         
-        # Sort by importance and size
-        important_files.sort(key=lambda x: (x['name'].lower(), x['size']))
-        regular_files.sort(key=lambda x: x['size'], reverse=True)
+        # Only the first max_files are kept, so select them instead of
+        # sorting everything; nsmallest/nlargest keep ties in input order
+        # like a stable sort
+        result = heapq.nsmallest(max_files, important_files, key=lambda x: (x['name'].lower(), x['size']))
+        result += heapq.nlargest(max_files - len(result), regular_files, key=lambda x: x['size'])
+        return result
+    
+    def _flatten_tree(self, children: Dict[str, List[Tuple[str, bool]]]) -> List[Tuple[int, str, bool]]:
+        """
+        Lay out the walked directories as file tree rows.
+        
+        Args:
+            children: (name, is_dir) entries of each walked directory, keyed
+                by relative path
+            
+        Returns:
+            (depth, name, is_dir) rows in depth-first preorder, with each
+            directory's subdirectories ahead of its files
+        """
+        rows = []
+        stack = [(0, '', iter(children['']))]
+        
+        while stack:
+            depth, prefix, entries = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+            
+            name, is_dir = entry
+            rows.append((depth, name, is_dir))
+            if is_dir:
+                path = prefix + name
+                stack.append((depth + 1, path + '/', iter(children.get(path, ()))))
         
-        # Combine and limit
-        result = important_files + regular_files
-        return result[:max_files]
+        return rows
     
-    def _get_simplified_tree(self, tree: Dict[str, Any], max_depth: int = 3, current_depth: int = 0) -> Dict[str, Any]:
+    def _get_simplified_tree(self, rows: List[Tuple[int, str, bool]], max_depth: int = 3) -> Dict[str, Any]:
         """Get a simplified version of the file tree for context."""
-        if current_depth >= max_depth:
+        if max_depth <= 0:
             return {"...": "truncated"}
         
         simplified = {}
-        for key, value in tree.items():
-            if isinstance(value, dict):
-                if value:  # Non-empty directory
-                    simplified[key + '/'] = self._get_simplified_tree(value, max_depth, current_depth + 1)
-                else:
-                    simplified[key + '/'] = {}
+        
+        # Directory dicts along the current path, indexed by depth
+        parents = [simplified]
+        for depth, name, is_dir in rows:
+            if depth >= max_depth:
+                # Directories at the depth limit only record that they have contents
+                parents[max_depth]["..."] = "truncated"
+                continue
+            
+            if is_dir:
+                del parents[depth + 1:]
+                parents.append({})
+                parents[depth][name + '/'] = parents[depth + 1]
             else:
-                simplified[key] = None
+                parents[depth][name] = None
         
         return simplified
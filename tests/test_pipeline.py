@@ -4,6 +4,7 @@ Test suite for the task-to-code pipeline.
 
 import pytest
 import os
+import json
 import tempfile
 import shutil
 from pathlib import Path
@@ -53,21 +54,18 @@ SAMPLE_JIRA_RESPONSE = {
 class TestConfig:
     """Test configuration management."""
     
-    def test_config_loading(self):
+    def test_config_loading(self, tmp_path):
         """Test configuration loading from YAML."""
         from src.config import Config
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write(SAMPLE_CONFIG)
-            f.flush()
-            
-            config = Config(f.name)
-            
-            assert config.confluence_config['base_url'] == "https://test.atlassian.net"
-            assert config.project_config['repository_path'] == "/tmp/test-project"
-            assert config.anthropic_config['api_key'] == "test-key"
-            
-            os.unlink(f.name)
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(SAMPLE_CONFIG)
+        
+        config = Config(str(config_path))
+        
+        assert config.confluence_config['base_url'] == "https://test.atlassian.net"
+        assert config.project_config['repository_path'] == "/tmp/test-project"
+        assert config.anthropic_config['api_key'] == "test-key"
     
     def test_config_validation(self):
         """Test configuration validation."""
@@ -88,33 +86,90 @@ confluence:
                 Config(f.name)
             
             os.unlink(f.name)
+    
+    def test_config_defaults(self, tmp_path):
+        """Test that optional settings fall back to built-in defaults."""
+        from src.config import Config
+        
+        minimal_config = SAMPLE_CONFIG.split("output:")[0].replace("  max_tokens: 4000\n", "")
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(minimal_config)
+        
+        config = Config(str(config_path))
+        
+        assert config.anthropic_config['max_tokens'] == 4000
+        assert config.anthropic_config['api_key'] == "test-key"
+        assert config.output_config['generated_code_path'] == "./generated"
+        assert config.get('output.backup_existing') is True
+    
+    def test_config_cache(self):
+        """Test that the parsed config is cached and invalidated on change."""
+        from src.config import Config
+        
+        test_dir = tempfile.mkdtemp()
+        try:
+            config_path = Path(test_dir) / "config.yaml"
+            config_path.write_text(SAMPLE_CONFIG)
+            
+            Config(str(config_path))
+            cache_path = Path(test_dir) / ".config.yaml.cache.json"
+            assert cache_path.exists()
+            
+            # The cache holds credentials, so only the owner may read it
+            assert cache_path.stat().st_mode & 0o777 == 0o600
+            
+            # A cached load returns the same values
+            config = Config(str(config_path))
+            assert config.anthropic_config['api_key'] == "test-key"
+            
+            # Editing the YAML invalidates the cache
+            config_path.write_text(SAMPLE_CONFIG.replace("test-key", "other-key-value"))
+            config = Config(str(config_path))
+            assert config.anthropic_config['api_key'] == "other-key-value"
+            
+            # A cache others can write to is ignored
+            cached = json.loads(cache_path.read_text())
+            cached['config']['anthropic']['api_key'] = "planted-key"
+            cache_path.write_text(json.dumps(cached))
+            cache_path.chmod(0o666)
+            assert Config(str(config_path)).anthropic_config['api_key'] == "other-key-value"
+        finally:
+            shutil.rmtree(test_dir)
+
+
+def _create_sample_project(root: Path):
+    """Create the sample project structure under root."""
+    (root / "src").mkdir()
+    (root / "tests").mkdir()
+    (root / "src" / "main.py").write_text("print('hello')")
+    (root / "src" / "__init__.py").write_text("")
+    (root / "tests" / "test_main.py").write_text("def test_main(): pass")
+    (root / "README.md").write_text("# Test Project")
+    (root / "requirements.txt").write_text("requests>=2.0.0")
+
+
+@pytest.fixture(scope="module")
+def analyzer(tmp_path_factory):
+    """Analyzer over a sample project, shared by the read-only tests."""
+    from src.project_analyzer import ProjectAnalyzer
+    
+    root = tmp_path_factory.mktemp("project")
+    _create_sample_project(root)
+    return ProjectAnalyzer(str(root))
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """Sample project of its own, for tests that modify the tree."""
+    _create_sample_project(tmp_path)
+    return tmp_path
 
 
 class TestProjectAnalyzer:
     """Test project structure analysis."""
     
-    def setup_method(self):
-        """Setup test project structure."""
-        self.test_dir = tempfile.mkdtemp()
-        
-        # Create sample project structure
-        (Path(self.test_dir) / "src").mkdir()
-        (Path(self.test_dir) / "tests").mkdir()
-        (Path(self.test_dir) / "src" / "main.py").write_text("print('hello')")
-        (Path(self.test_dir) / "src" / "__init__.py").write_text("")
-        (Path(self.test_dir) / "tests" / "test_main.py").write_text("def test_main(): pass")
-        (Path(self.test_dir) / "README.md").write_text("# Test Project")
-        (Path(self.test_dir) / "requirements.txt").write_text("requests>=2.0.0")
-    
-    def teardown_method(self):
-        """Cleanup test files."""
-        shutil.rmtree(self.test_dir)
-    
-    def test_project_structure_analysis(self):
+    def test_project_structure_analysis(self, analyzer):
         """Test project structure analysis."""
-        from src.project_analyzer import ProjectAnalyzer
-        
-        analyzer = ProjectAnalyzer(self.test_dir)
         structure = analyzer.get_project_structure()
         
         assert structure['total_files'] >= 5
@@ -126,11 +181,8 @@ class TestProjectAnalyzer:
         assert 'src/main.py' in file_paths
         assert 'README.md' in file_paths
     
-    def test_context_summary(self):
+    def test_context_summary(self, analyzer):
         """Test context summary generation."""
-        from src.project_analyzer import ProjectAnalyzer
-        
-        analyzer = ProjectAnalyzer(self.test_dir)
         context = analyzer.get_context_summary()
         
         assert 'project_overview' in context
@@ -138,6 +190,101 @@ class TestProjectAnalyzer:
         assert 'important_files' in context
         
         assert context['project_overview']['languages'] == ['Python']
+    
+    def test_structure_cache(self, project_dir):
+        """Test that the structure is reused until the cache is invalidated."""
+        from src.project_analyzer import ProjectAnalyzer
+        
+        analyzer = ProjectAnalyzer(str(project_dir))
+        structure = analyzer.get_project_structure()
+        
+        (project_dir / "src" / "app.js").write_text("console.log('hi')")
+        assert analyzer.get_project_structure() is structure
+        
+        analyzer.invalidate_cache()
+        structure = analyzer.get_project_structure()
+        assert 'JavaScript' in structure['languages']
+        assert (1, 'app.js', False) in structure['file_tree']
+    
+    def test_excluded_framework_indicator(self, project_dir):
+        """Test that framework indicator files are read even when excluded from the scan."""
+        from src.project_analyzer import ProjectAnalyzer
+        
+        (project_dir / "requirements.txt").write_text("flask>=2.0\n")
+        
+        analyzer = ProjectAnalyzer(str(project_dir), exclude_patterns=["requirements*.txt"])
+        structure = analyzer.get_project_structure()
+        
+        assert 'requirements.txt' not in [f['path'] for f in structure['files']]
+        assert structure['frameworks'] == ['Flask']
+    
+    def test_trailing_dot_extension(self, project_dir):
+        """Test that a name ending in a dot has no extension, as with Path.suffix."""
+        from src.project_analyzer import ProjectAnalyzer
+        
+        (project_dir / "notes.").write_text("")
+        
+        analyzer = ProjectAnalyzer(str(project_dir))
+        files = {f['name']: f for f in analyzer.get_project_structure()['files']}
+        
+        assert files['notes.']['extension'] == ''
+        assert files['main.py']['extension'] == '.py'
+    
+    def test_directory_order(self, project_dir):
+        """Test that directories are listed in os.walk order."""
+        from src.project_analyzer import ProjectAnalyzer
+        
+        (project_dir / "src" / "pkg" / "sub").mkdir(parents=True)
+        (project_dir / "tests" / "unit").mkdir()
+        (project_dir / "docs").mkdir()
+        
+        structure = ProjectAnalyzer(str(project_dir)).get_project_structure()
+        
+        expected = [os.path.relpath(root, project_dir).replace(os.sep, '/') for root, _, _ in os.walk(project_dir)]
+        assert [d['path'] for d in structure['directories']] == expected
+    
+    def test_excluded_directories_not_scanned(self, project_dir, mocker):
+        """Test that excluded directories are pruned before being listed."""
+        from src.project_analyzer import ProjectAnalyzer
+        
+        (project_dir / "node_modules" / "pkg").mkdir(parents=True)
+        (project_dir / "node_modules" / "pkg" / "index.js").write_text("")
+        
+        analyzer = ProjectAnalyzer(str(project_dir))
+        walk = mocker.spy(analyzer, '_scandir_walk')
+        structure = analyzer.get_project_structure()
+        
+        scanned = {call.args[0] for call in walk.call_args_list if call.args}
+        assert scanned == {'src', 'tests'}
+        assert (0, 'node_modules', True) not in structure['file_tree']
+        assert 'JavaScript' not in structure['languages']
+    
+    def test_relevant_files_skip_structure(self, project_dir, mocker):
+        """Test that the keyword search lists files without analyzing the structure."""
+        from src.project_analyzer import ProjectAnalyzer
+        
+        analyzer = ProjectAnalyzer(str(project_dir))
+        scan = mocker.spy(analyzer, '_scan_repository')
+        
+        relevant = analyzer.get_relevant_files(['hello', 'test_'])
+        assert [f['path'] for f in relevant] == ['src/main.py', 'tests/test_main.py']
+        assert scan.call_count == 0
+    
+    def test_modification_signature(self, project_dir):
+        """Test that the repository signature tracks added and excluded files."""
+        from src.project_analyzer import ProjectAnalyzer
+        
+        analyzer = ProjectAnalyzer(str(project_dir))
+        signature = analyzer.get_modification_signature()
+        
+        assert analyzer.get_modification_signature() == signature
+        
+        (project_dir / "src" / "__pycache__").mkdir()
+        (project_dir / "src" / "__pycache__" / "main.pyc").write_text("")
+        assert analyzer.get_modification_signature()[0] == signature[0]
+        
+        (project_dir / "src" / "utils.py").write_text("x = 1")
+        assert analyzer.get_modification_signature()[0] == signature[0] + 1
 
 
 class TestConfluenceClient:
@@ -156,6 +303,131 @@ class TestConfluenceClient:
         assert len(details) == 2
         assert "Should do X" in details
         assert "Should do Y" in details
+    
+    def test_acceptance_criteria_edge_lines(self):
+        """Test that repeated headers are skipped and Unicode indentation is allowed."""
+        from src._requirements import extract_acceptance_criteria, extract_requirements
+        
+        description = (
+            "Acceptance criteria:\n"
+            "- Acceptance criteria must be documented\n"
+            "\xa0- Indented item\n"
+            "## Acceptance criteria (continued)\n"
+            "* Last item\xa0\n"
+            "## Notes\n"
+            "- Not a criterion"
+        )
+        
+        assert extract_acceptance_criteria(description) == ["Indented item", "Last item"]
+        assert extract_requirements("Requirements:\n\xa0- Indented item\n===\n- After rule") == ["Indented item"]
+    
+    def test_atlas_doc_text_extraction(self):
+        """Test extracting plain text from an Atlas document."""
+        from src.confluence_client import ConfluenceJiraClient
+        
+        client = ConfluenceJiraClient("https://test.atlassian.net", "test", "token")
+        
+        doc = {
+            "type": "doc",
+            "content": [
+                {"type": "heading", "content": [{"type": "text", "text": "Requirements"}]},
+                {"type": "bulletList", "content": [
+                    {"type": "listItem", "content": [
+                        {"type": "paragraph", "content": [{"type": "text", "text": "Should do X"}]}
+                    ]},
+                    {"type": "listItem", "content": [
+                        {"type": "paragraph", "content": [
+                            {"type": "text", "text": "Should "},
+                            {"type": "text", "text": "do Y"}
+                        ]}
+                    ]}
+                ]}
+            ]
+        }
+        
+        expected = "Requirements\nShould do X\n\nShould do Y"
+        assert client._extract_text_from_atlas_doc(json.dumps(doc)) == expected
+        assert client._extract_text_from_atlas_doc(doc) == expected
+        assert client._extract_text_from_atlas_doc("not json") == "not json"
+    
+    def test_batched_issue_details(self, mocker):
+        """Test fetching several JIRA issues with one search request."""
+        from src.confluence_client import ConfluenceJiraClient
+        
+        client = ConfluenceJiraClient("https://test.atlassian.net", "test", "token")
+        
+        other_issue = dict(SAMPLE_JIRA_RESPONSE, key="TEST-124")
+        response = mocker.Mock()
+        response.content = json.dumps({"issues": [other_issue, SAMPLE_JIRA_RESPONSE]}).encode()
+        response.headers = {}
+        post = mocker.patch.object(client.session, 'post', return_value=response)
+        
+        details = client.get_jira_issues_details(["TEST-123", "TEST-124"])
+        
+        assert post.call_count == 1
+        assert 'key in ("TEST-123", "TEST-124")' in post.call_args.kwargs['json']['jql']
+        assert [d['key'] for d in details] == ["TEST-123", "TEST-124"]
+        assert details[0]['summary'] == "Test Issue"
+        assert details[0]['issue_type'] == "Story"
+    
+    def test_batched_issue_details_pages_and_fallback(self, mocker):
+        """Test that batched issue search follows pages and fetches unmatched keys one by one."""
+        from src.confluence_client import ConfluenceJiraClient
+        
+        client = ConfluenceJiraClient("https://test.atlassian.net", "test", "token")
+        
+        pages = [
+            {"issues": [SAMPLE_JIRA_RESPONSE], "nextPageToken": "next"},
+            {"issues": [dict(SAMPLE_JIRA_RESPONSE, key="TEST-124")]}
+        ]
+        responses = [mocker.Mock(content=json.dumps(page).encode(), headers={}) for page in pages]
+        post = mocker.patch.object(client.session, 'post', side_effect=responses)
+        moved = mocker.patch.object(client, 'get_jira_issue', return_value=dict(SAMPLE_JIRA_RESPONSE, key="NEW-1"))
+        
+        details = client.get_jira_issues_details(["test-123", "TEST-124", "OLD-1"])
+        
+        assert post.call_count == 2
+        assert post.call_args.args[0].endswith("/rest/api/3/search/jql")
+        assert post.call_args.kwargs['json']['nextPageToken'] == "next"
+        moved.assert_called_once_with("OLD-1")
+        assert [d['key'] for d in details] == ["TEST-123", "TEST-124", "NEW-1"]
+    
+    def test_batched_issue_details_rejected_search(self, mocker):
+        """Test that issues are fetched one by one when JIRA rejects the batch query."""
+        import requests
+        from src.confluence_client import ConfluenceJiraClient
+        
+        client = ConfluenceJiraClient("https://test.atlassian.net", "test", "token")
+        
+        response = mocker.Mock(status_code=400)
+        response.raise_for_status.side_effect = requests.HTTPError(response=response)
+        post = mocker.patch.object(client.session, 'post', return_value=response)
+        get_issue = mocker.patch.object(client, 'get_jira_issue', side_effect=lambda key: dict(SAMPLE_JIRA_RESPONSE, key=key))
+        
+        details = client.get_jira_issues_details(["TEST-1", 'BAD"KEY'])
+        
+        assert 'key in ("TEST-1", "BAD\\"KEY")' in post.call_args.kwargs['json']['jql']
+        assert [call.args[0] for call in get_issue.call_args_list] == ["TEST-1", 'BAD"KEY']
+        assert [d['key'] for d in details] == ["TEST-1", 'BAD"KEY']
+    
+    def test_search_pagination(self, mocker):
+        """Test that JQL search follows page tokens until max_results."""
+        from src.confluence_client import ConfluenceJiraClient
+        
+        client = ConfluenceJiraClient("https://test.atlassian.net", "test", "token")
+        
+        pages = [
+            {"issues": [{"key": "TEST-1"}, {"key": "TEST-2"}], "nextPageToken": "next"},
+            {"issues": [{"key": "TEST-3"}, {"key": "TEST-4"}]}
+        ]
+        responses = [mocker.Mock(content=json.dumps(page).encode()) for page in pages]
+        get = mocker.patch.object(client.session, 'get', side_effect=responses)
+        
+        issues = list(client.search_jira_issues("project = TEST", max_results=3))
+        
+        assert [issue['key'] for issue in issues] == ["TEST-1", "TEST-2", "TEST-3"]
+        assert get.call_count == 2
+        assert get.call_args.kwargs['params']['nextPageToken'] == "next"
 
 
 class TestClaudeGenerator:
@@ -211,6 +483,198 @@ Some notes here.
         assert result['files'][0]['path'] == "src/test.py"
         assert "def test_function():" in result['files'][0]['content']
         assert len(result['dependencies']) == 2
+    
+    @pytest.mark.parametrize("files_section, expected", [
+        # Blank line between the header and the fence
+        ("### File: src/a.py\n\n```python\nx = 1\n```\n", [("src/a.py", "x = 1")]),
+        # No fence at all
+        ("### File: src/a.py\nx = 1\n\n### File: src/b.py\n```\ny = 2\n```\n",
+         [("src/a.py", "x = 1"), ("src/b.py", "y = 2")]),
+        # Last block cut off before its closing fence
+        ("### File: src/a.py\n```python\nx = 1\n```\n### File: src/b.py\n```python\ny = 2\nz =",
+         [("src/a.py", "x = 1"), ("src/b.py", "y = 2\nz =")]),
+        # Code block nested in the file
+        ("### File: README.md\n```markdown\n# Title\n\n```bash\npip install foo\n```\n\nMore docs.\n```\n"
+         "### File: src/b.py\n```python\ny = 2\n```\n",
+         [("README.md", "# Title\n\n```bash\npip install foo\n```\n\nMore docs."), ("src/b.py", "y = 2")]),
+    ], ids=["blank-line", "no-fence", "truncated", "nested-fence"])
+    def test_code_response_loose_file_blocks(self, files_section, expected):
+        """Test that file blocks Claude formats loosely or cuts off are still parsed."""
+        from src.claude_generator import ClaudeCodeGenerator
+        
+        generator = ClaudeCodeGenerator("test-key")
+        response = "## Files to Create/Modify\n\n" + files_section
+        
+        result = generator._parse_code_response(response, {"key": "TEST-123"})
+        
+        assert [(f['path'], f['content']) for f in result['files']] == expected
+    
+    def test_test_response_parsing(self):
+        """Test parsing of Claude's test response."""
+        from src.claude_generator import ClaudeCodeGenerator
+        
+        generator = ClaudeCodeGenerator("test-key")
+        
+        sample_response = """
+## Test Strategy
+Unit tests only.
+
+## Test Files
+
+### File: tests/test_utils.py
+```python
+def test_helper():
+    assert helper() is None
+```
+
+## Test Dependencies
+- pytest>=7.0.0
+
+## Running the Tests
+pytest tests/
+"""
+        
+        result = generator._parse_test_response(sample_response)
+        
+        assert len(result['test_files']) == 1
+        assert result['test_files'][0]['path'] == "tests/test_utils.py"
+        assert result['test_files'][0]['content'] == "def test_helper():\n    assert helper() is None"
+        assert "Unit tests only." in result['strategy']
+        assert result['dependencies'] == ["- pytest>=7.0.0"]
+        assert "pytest tests/" in result['run_instructions']
+    
+    def test_code_and_test_response_parsing(self):
+        """Test parsing of a combined code and test response."""
+        from src.claude_generator import ClaudeCodeGenerator
+        
+        generator = ClaudeCodeGenerator("test-key")
+        
+        sample_response = """
+## Analysis
+Small helper.
+
+## Files to Create/Modify
+
+### File: src/utils.py
+```python
+def helper():
+    pass
+```
+
+## Dependencies
+- requests>=2.0.0
+
+## Test Strategy
+Unit tests.
+
+## Test Files
+
+### File: tests/test_utils.py
+```python
+def test_helper():
+    assert helper() is None
+```
+
+## Test Dependencies
+- pytest>=7.0.0
+"""
+        
+        result = generator._parse_code_and_test_response(sample_response, {"key": "TEST-123"})
+        
+        assert result['code']['task_key'] == "TEST-123"
+        assert [f['path'] for f in result['code']['files']] == ["src/utils.py"]
+        assert result['code']['dependencies'] == ["- requests>=2.0.0"]
+        assert [f['path'] for f in result['tests']['test_files']] == ["tests/test_utils.py"]
+        assert result['tests']['dependencies'] == ["- pytest>=7.0.0"]
+    
+    def test_truncated_code_and_test_response(self, mocker):
+        """Test that tests are generated separately when the combined response is cut off."""
+        from src.claude_generator import ClaudeCodeGenerator
+        
+        generator = ClaudeCodeGenerator("test-key", max_tokens=1000)
+        
+        truncated_response = """
+## Files to Create/Modify
+
+### File: src/utils.py
+```python
+def helper():
+    pass
+```
+
+## Dependencies
+- requests>=2.0.0
+
+## Test Files
+
+### File: tests/test_utils.py
+```python
+def test_hel"""
+        
+        complete = mocker.patch.object(generator, '_complete', return_value=(truncated_response, "max_tokens"))
+        tests = {'test_files': [{'path': "tests/test_utils.py"}]}
+        generate_tests = mocker.patch.object(generator, 'generate_tests', return_value=tests)
+        
+        context = {'project_overview': {'languages': [], 'frameworks': []},
+                   'directory_structure': {}, 'important_files': []}
+        result = generator.generate_code_and_tests({"key": "TEST-123"}, context)
+        
+        assert complete.call_args.args[1] == 2000
+        assert [f['path'] for f in result['code']['files']] == ["src/utils.py"]
+        assert generate_tests.call_args.args[0] == result['code']['files']
+        assert result['tests'] is tests
+    
+    def test_truncated_code_section_retried(self, mocker):
+        """Test that code cut off in the combined response is asked for again with the combined budget."""
+        from src.claude_generator import ClaudeCodeGenerator
+        
+        generator = ClaudeCodeGenerator("test-key", max_tokens=1000)
+        
+        cut_off = "## Files to Create/Modify\n\n### File: src/utils.py\n```python\ndef hel"
+        complete_code = "## Files to Create/Modify\n\n### File: src/utils.py\n```python\ndef helper():\n    pass\n```\n"
+        complete = mocker.patch.object(generator, '_complete', side_effect=[
+            (cut_off, "max_tokens"), (complete_code, "end_turn")
+        ])
+        mocker.patch.object(generator, 'generate_tests', return_value={'test_files': []})
+        
+        context = {'project_overview': {'languages': [], 'frameworks': []},
+                   'directory_structure': {}, 'important_files': []}
+        result = generator.generate_code_and_tests({"key": "TEST-123"}, context)
+        
+        assert [call.args[1] for call in complete.call_args_list] == [2000, 2000]
+        assert result['code']['files'][0]['content'] == "def helper():\n    pass"
+        
+        # A retry that is cut off again is reported rather than saved
+        complete.side_effect = [(cut_off, "max_tokens"), (cut_off, "max_tokens")]
+        with pytest.raises(RuntimeError, match="combined_max_tokens"):
+            generator.generate_code_and_tests({"key": "TEST-123"}, context)
+    
+    def test_response_cache(self, mocker):
+        """Test that identical prompts are answered from the response cache."""
+        from src.claude_generator import ClaudeCodeGenerator
+        
+        cache_dir = tempfile.mkdtemp()
+        try:
+            generator = ClaudeCodeGenerator("test-key", cache_dir=cache_dir)
+            stream = mocker.patch.object(generator.client.messages, 'stream')
+            response = stream.return_value.__enter__.return_value
+            response.text_stream = ["cached ", "answer"]
+            response.get_final_message.return_value.stop_reason = "end_turn"
+            
+            assert generator._send_prompt("same prompt") == "cached answer"
+            assert generator._send_prompt("same prompt") == "cached answer"
+            assert stream.call_count == 1
+            
+            generator._send_prompt("other prompt")
+            assert stream.call_count == 2
+            
+            # Responses cut off at max_tokens are not stored
+            response.get_final_message.return_value.stop_reason = "max_tokens"
+            generator._send_prompt("long prompt")
+            generator._send_prompt("long prompt")
+            assert stream.call_count == 4
+        finally:
+            shutil.rmtree(cache_dir)
 
 
 if __name__ == "__main__":
@@ -3,27 +3,26 @@
 Validation script to test the task-to-code pipeline setup.
 """
 
+import importlib
+import importlib.util
 import sys
 import os
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 def check_python_version():
     """Check Python version."""
-    print("🐍 Checking Python version...")
+    lines = ["🐍 Checking Python version..."]
     version = sys.version_info
     if version.major >= 3 and version.minor >= 8:
-        print(f"   ✅ Python {version.major}.{version.minor}.{version.micro} (OK)")
-        return True
+        lines.append(f"   ✅ Python {version.major}.{version.minor}.{version.micro} (OK)")
+        return True, lines
     else:
-        print(f"   ❌ Python {version.major}.{version.minor}.{version.micro} (Requires 3.8+)")
-        return False
+        lines.append(f"   ❌ Python {version.major}.{version.minor}.{version.micro} (Requires 3.8+)")
+        return False, lines
 
 def check_dependencies():
     """Check if required dependencies are installed."""
-    print("\n📦 Checking dependencies...")
+    lines = ["\n📦 Checking dependencies..."]
     
     required_packages = [
         ('requests', 'requests'),
@@ -35,57 +34,63 @@ def check_dependencies():
     
     missing = []
     
+    # Only locate the packages; importing them (anthropic especially) is
+    # slow and not needed to know they are installed
     for import_name, package_name in required_packages:
         try:
-            __import__(import_name)
-            print(f"   ✅ {package_name}")
-        except ImportError:
-            print(f"   ❌ {package_name} (missing)")
+            found = importlib.util.find_spec(import_name) is not None
+        except (ImportError, ValueError):
+            found = False
+        
+        if found:
+            lines.append(f"   ✅ {package_name}")
+        else:
+            lines.append(f"   ❌ {package_name} (missing)")
             missing.append(package_name)
     
     if missing:
-        print(f"\n💡 Install missing packages: pip install {' '.join(missing)}")
-        return False
+        lines.append(f"\n💡 Install missing packages: pip install {' '.join(missing)}")
+        return False, lines
     
-    return True
+    return True, lines
 
 def check_configuration():
     """Check configuration file."""
-    print("\n⚙️  Checking configuration...")
+    lines = ["\n⚙️  Checking configuration..."]
     
     config_file = Path('config.yaml')
     template_file = Path('config.template.yaml')
     
     if not template_file.exists():
-        print("   ❌ config.template.yaml not found")
-        return False
+        lines.append("   ❌ config.template.yaml not found")
+        return False, lines
     else:
-        print("   ✅ config.template.yaml found")
+        lines.append("   ✅ config.template.yaml found")
     
     if not config_file.exists():
-        print("   ⚠️  config.yaml not found (run: python main.py setup)")
-        return False
+        lines.append("   ⚠️  config.yaml not found (run: python main.py setup)")
+        return False, lines
     
     try:
         from src.config import Config
         config = Config('config.yaml')
-        print("   ✅ config.yaml valid")
+        lines.append("   ✅ config.yaml valid")
         
         # Check if values are filled in
         if config.get('confluence.base_url', '').startswith('your-'):
-            print("   ⚠️  Please update config.yaml with your actual values")
-            return False
+            lines.append("   ⚠️  Please update config.yaml with your actual values")
+            return False, lines
         
-        print("   ✅ Configuration appears complete")
-        return True
+        lines.append("   ✅ Configuration appears complete")
+        return True, lines
         
     except Exception as e:
-        print(f"   ❌ config.yaml error: {e}")
-        return False
+        lines.append(f"   ❌ config.yaml error: {e}")
+        return False, lines
 
 def check_project_structure():
     """Check project structure."""
-    print("\n📁 Checking project structure...")
+    lines = ["\n📁 Checking project structure..."]
     
     required_files = [
         'main.py',
@@ -102,16 +107,16 @@ def check_project_structure():
     
     for file_path in required_files:
         if Path(file_path).exists():
-            print(f"   ✅ {file_path}")
+            lines.append(f"   ✅ {file_path}")
         else:
-            print(f"   ❌ {file_path} (missing)")
+            lines.append(f"   ❌ {file_path} (missing)")
             all_good = False
     
-    return all_good
+    return all_good, lines
 
 def test_imports():
     """Test if all modules can be imported."""
-    print("\n🔧 Testing module imports...")
+    lines = ["\n🔧 Testing module imports..."]
     
     modules = [
         'src.config',
@@ -123,43 +128,46 @@ def test_imports():
     
     all_good = True
     
+    # These do need executing, to catch errors in the modules themselves
     for module in modules:
         try:
-            __import__(module)
-            print(f"   ✅ {module}")
+            importlib.import_module(module)
+            lines.append(f"   ✅ {module}")
         except ImportError as e:
-            print(f"   ❌ {module}: {e}")
+            lines.append(f"   ❌ {module}: {e}")
             all_good = False
     
-    return all_good
+    return all_good, lines
 
 def test_basic_functionality():
     """Test basic functionality."""
-    print("\n🧪 Testing basic functionality...")
+    lines = ["\n🧪 Testing basic functionality..."]
     
     try:
         # Test project analyzer on current directory
         from src.project_analyzer import ProjectAnalyzer
         analyzer = ProjectAnalyzer('.')
         structure = analyzer.get_project_structure()
-        print(f"   ✅ Project analyzer (found {structure['total_files']} files)")
+        lines.append(f"   ✅ Project analyzer (found {structure['total_files']} files)")
         
         # Test Claude generator (without API call)
         from src.claude_generator import ClaudeCodeGenerator
         generator = ClaudeCodeGenerator('test-key')
         lang = generator._detect_language_from_path('test.py')
-        print(f"   ✅ Claude generator (detected language: {lang})")
+        lines.append(f"   ✅ Claude generator (detected language: {lang})")
         
-        return True
+        return True, lines
         
     except Exception as e:
-        print(f"   ❌ Basic functionality test failed: {e}")
-        return False
+        lines.append(f"   ❌ Basic functionality test failed: {e}")
+        return False, lines
 
 def main():
     """Run all validation checks."""
-    print("🔍 Task-to-Code Pipeline Validation\n")
+    # Output is collected and written in one go at the end
+    lines = ["🔍 Task-to-Code Pipeline Validation\n"]
     
+    # Each check returns whether it passed and the lines it reports
     checks = [
         ("Python Version", check_python_version),
         ("Dependencies", check_dependencies),
@@ -173,38 +181,42 @@ def main():
     
     for name, check_func in checks:
         try:
-            result = check_func()
+            result, check_lines = check_func()
+            lines.extend(check_lines)
             results.append((name, result))
         except Exception as e:
-            print(f"   ❌ {name} check failed with error: {e}")
+            lines.append(f"   ❌ {name} check failed with error: {e}")
             results.append((name, False))
     
     # Summary
-    print("\n" + "="*50)
-    print("📊 VALIDATION SUMMARY")
-    print("="*50)
+    lines.append("\n" + "="*50)
+    lines.append("📊 VALIDATION SUMMARY")
+    lines.append("="*50)
     
     passed = 0
     for name, result in results:
         status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status:8} {name}")
+        lines.append(f"{status:8} {name}")
         if result:
             passed += 1
     
-    print(f"\nResult: {passed}/{len(results)} checks passed")
+    lines.append(f"\nResult: {passed}/{len(results)} checks passed")
     
     if passed == len(results):
-        print("\n🎉 All checks passed! The pipeline is ready to use.")
-        print("\nNext steps:")
-        print("1. Update config.yaml with your API credentials")
-        print("2. Set your project repository path")
-        print("3. Run: python main.py jira YOUR-ISSUE-KEY")
+        lines.append("\n🎉 All checks passed! The pipeline is ready to use.")
+        lines.append("\nNext steps:")
+        lines.append("1. Update config.yaml with your API credentials")
+        lines.append("2. Set your project repository path")
+        lines.append("3. Run: python main.py jira YOUR-ISSUE-KEY")
     else:
-        print("\n⚠️  Some checks failed. Please fix the issues above.")
-        print("\nFor help:")
-        print("- Check the README.md file")
-        print("- Run: python main.py --help")
-        print("- Review the WORKFLOW.md documentation")
+        lines.append("\n⚠️  Some checks failed. Please fix the issues above.")
+        lines.append("\nFor help:")
+        lines.append("- Check the README.md file")
+        lines.append("- Run: python main.py --help")
+        lines.append("- Review the WORKFLOW.md documentation")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
     
     return passed == len(results)
 